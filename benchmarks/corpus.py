@@ -0,0 +1,36 @@
+import os
+import sys
+
+from sec_edgar import Fetcher
+from sec_edgar import FilingCache
+from sec_edgar import ReportParser
+
+DEFAULT_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "sec_edgar", "data")
+# the benchmarks only read the cache, the fetcher never sends a request
+USER_AGENT = "sec_edgar benchmarks benchmarks@example.com"
+
+
+def open_corpus(arguments):
+    # the full submissions of an existing filing cache folder (ReportParser's output_folder, sec_edgar/data by
+    # default) and a ReportParser reading that folder without a result cache. exits when there are none, an empty
+    # corpus would make every benchmark pass
+    folder = arguments[0] if arguments else DEFAULT_FOLDER
+    if not os.path.isfile(os.path.join(folder, "filing_cache.sqlite")):
+        sys.exit(f"No filing cache in {folder}, run ReportParser.parse on some filings first")
+    cache = FilingCache(folder)
+    keys = [key for key, in cache.connection.execute("SELECT key FROM entries WHERE key LIKE '%.txt' ORDER BY key")]
+    if not keys:
+        sys.exit(f"No submissions in the filing cache in {folder}")
+    report_parser = ReportParser(folder, Fetcher(user_agent=USER_AGENT), cache_results=False)
+    return cache, keys, report_parser
+
+
+def iter_filings(cache, keys):
+    # (file name, content) of each submission, one at a time
+    for key in keys:
+        stream = cache.open(key)
+        if stream is None:
+            # evicted since it was listed
+            continue
+        with stream:
+            yield os.path.basename(key), stream.read()
@@ -0,0 +1,60 @@
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import requests
+
+from sec_edgar import Fetcher
+
+
+class EdgarStandInHandler(BaseHTTPRequestHandler):
+    # serves edgar/data/<cik>/<accession>.txt shaped paths with a fixed latency, keep-alive enabled
+    protocol_version = "HTTP/1.1"
+    latency = 0.02
+    body = b"<SEC-DOCUMENT>\nCONFORMED PERIOD OF REPORT:\t20200331\n" + b"x" * 200000 + b"\n</SEC-DOCUMENT>\n"
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        if not self.path.startswith("/Archives/edgar/data/"):
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stand_in():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), EdgarStandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main(num_filings=200, connections=8):
+    server, base_url = start_stand_in()
+    urls = [f"https://www.sec.gov/Archives/edgar/data/{i}/0000000000-20-{i:06d}.txt" for i in range(num_filings)]
+    fetcher = Fetcher(base_url, connections=connections, user_agent="sec_edgar benchmark benchmark@example.com")
+
+    start = time.perf_counter()
+    for url in urls:
+        requests.get(fetcher.url(url)).content
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _, content, error in fetcher.iter_fetch(urls, lambda url: fetcher.get(url).content):
+        if error is not None:
+            raise error
+    pooled = time.perf_counter() - start
+    server.shutdown()
+    print(f"{num_filings} filings, bare requests.get: {sequential:.2f}s, "
+          f"Fetcher with {connections} pooled connections: {pooled:.2f}s")
+
+
+if __name__ == '__main__':
+    # usage: python benchmarks/fetch_benchmark.py [num_filings] [connections]
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,66 @@
+import sys
+import time
+
+import dateutil.parser as dparser
+
+from sec_edgar.line_classifier import DATE_ROW
+from sec_edgar.line_classifier import TEXT
+from sec_edgar.line_classifier import classify_line
+from sec_edgar.line_classifier import clean_table_line
+from sec_edgar.line_classifier import is_fuzzy_date
+from sec_edgar.raw_text import RawLines
+
+from corpus import iter_filings
+from corpus import open_corpus
+
+
+def reference_is_date(line):
+    # the check Parser._lines_to_splitted_rows used to run
+    try:
+        dparser.parse(line, fuzzy=True)
+        return True
+    except:
+        return False
+
+
+def corpus_lines(arguments):
+    # every normalized line of the raw text filings, cleaned the way table rows are
+    cache, keys, report_parser = open_corpus(arguments)
+    lines = []
+    for _, content in iter_filings(cache, keys):
+        report_content, content_type = report_parser._get_report_content(content)
+        if content_type != "raw":
+            continue
+        lines += [clean_table_line(line) for line in RawLines(report_content).lines]
+    return lines
+
+
+def main(arguments):
+    lines = corpus_lines(arguments)
+    if not lines:
+        sys.exit("No raw text filings in the corpus")
+    # only lines that get past the skip and number checks reach the date check
+    candidates = [line for line in lines if classify_line(line) in (DATE_ROW, TEXT)]
+    print(f"{len(lines)} lines, {len(candidates)} reach the date check")
+    start = time.perf_counter()
+    expected = [reference_is_date(line) for line in candidates]
+    reference_time = time.perf_counter() - start
+    start = time.perf_counter()
+    prefiltered = [is_fuzzy_date(line) for line in candidates]
+    prefiltered_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for line in lines:
+        classify_line(line)
+    classify_time = time.perf_counter() - start
+    mismatches = [(line, e, a) for line, e, a in zip(candidates, expected, prefiltered) if e != a]
+    for line, e, a in mismatches:
+        print(f"  {line!r:.80}: dateutil {e}, classifier {a}")
+    print(f"{'dateutil (s)':>15}{'prefiltered (s)':>18}{'classify all (s)':>18}{'mismatches':>12}")
+    print(f"{reference_time:>15.3f}{prefiltered_time:>18.3f}{classify_time:>18.3f}{len(mismatches):>12}")
+    return len(mismatches)
+
+
+if __name__ == '__main__':
+    # usage: python benchmarks/line_classifier_benchmark.py [filing cache folder]
+    # runs on the submissions already cached by ReportParser, exits non zero when the classifier disagrees with dateutil
+    sys.exit(1 if main(sys.argv[1:]) else 0)
@@ -0,0 +1,73 @@
+import random
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+from sec_edgar import SecEdgar
+
+FORM_TYPES = ["4", "8-K", "10-Q", "10-K", "SC 13G/A", "424B2", "D", "6-K", "13F-HR", "S-8"]
+FORM_WEIGHTS = [40, 12, 6, 2, 10, 10, 6, 6, 4, 4]
+
+
+def synthetic_master_idx(num_rows, seed=0):
+    random_generator = random.Random(seed)
+    lines = ["Description:           Master Index of EDGAR Dissemination Feed",
+             "Last Data Received:    March 31, 2020", "", "",
+             "CIK|Company Name|Form Type|Date Filed|Filename",
+             "--------------------------------------------------------------------------------"]
+    form_types = random_generator.choices(FORM_TYPES, FORM_WEIGHTS, k=num_rows)
+    for i, form_type in enumerate(form_types):
+        cik = random_generator.randint(1000, 1800000)
+        lines.append(f"{cik}|COMPANY {cik} INC|{form_type}|2020-0{1 + i % 3}-{1 + i % 28:02d}|"
+                     f"edgar/data/{cik}/0000{cik:06d}-20-{i:06d}.txt")
+    return "\n".join(lines)
+
+
+def pandas_reports_paths(master_idx):
+    # the DataFrame based implementation SecEdgar.get_reports_paths used to have
+    content_lines = master_idx.splitlines()
+    data = []
+    for line in content_lines:
+        if line.startswith("CIK"):
+            columns = line.split("|")
+        else:
+            if line.endswith(".txt"):
+                data.append(line.split("|"))
+    df = pd.DataFrame(data, columns=columns)
+    annual_and_quarterly_forms = df[(df["Form Type"] == "10-Q") | (df["Form Type"] == "10-K")]
+    annual_and_quarterly_forms["Filename"] = annual_and_quarterly_forms["Filename"].apply(
+        lambda x: f"https://www.sec.gov/Archives/{x}")
+    output = annual_and_quarterly_forms[["CIK", "Form Type", "Filename"]].groupby(by=["CIK", "Form Type"])[
+        "Filename"].apply(list).to_dict()
+    output = {"_".join(k): v for k, v in output.items()}
+    return output
+
+
+def measure(function, master_idx):
+    tracemalloc.start()
+    start = time.perf_counter()
+    output = function(master_idx)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return output, elapsed, peak
+
+
+def main(num_rows=400000):
+    master_idx = synthetic_master_idx(num_rows)
+    # get_reports_paths doesn't touch the instance, no need to download the ticker map
+    edgar_sec = SecEdgar.__new__(SecEdgar)
+    expected, pandas_elapsed, pandas_peak = measure(pandas_reports_paths, master_idx)
+    output, streaming_elapsed, streaming_peak = measure(edgar_sec.get_reports_paths, master_idx)
+    if output != expected:
+        raise Exception("The streaming index builder doesn't match the pandas implementation")
+    print(f"{num_rows} rows, {len(output)} CIK/form type groups")
+    print(f"pandas:    {pandas_elapsed:.2f}s, peak {pandas_peak / 2 ** 20:.1f}MB")
+    print(f"streaming: {streaming_elapsed:.2f}s, peak {streaming_peak / 2 ** 20:.1f}MB")
+
+
+if __name__ == '__main__':
+    # usage: python benchmarks/master_idx_benchmark.py [num_rows]
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,68 @@
+import sys
+import time
+import tracemalloc
+import contextlib
+import io
+
+from sec_edgar import BalanceSheetParser
+from sec_edgar import CashFlowParser
+from sec_edgar import IncomeStatementParser
+from sec_edgar import ParsedDocument
+
+from corpus import iter_filings
+from corpus import open_corpus
+
+
+def build(report_content, selective):
+    tracemalloc.start()
+    start = time.perf_counter()
+    document = ParsedDocument(report_content, "html", selective=selective)
+    nodes = len(document.order)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return document, nodes, elapsed, peak
+
+
+def outputs(parsers, document):
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for parser in parsers:
+            try:
+                results[parser.__class__.__name__] = parser.parse(document, "html")[0]
+            except Exception as e:
+                results[parser.__class__.__name__] = repr(e)
+    return results
+
+
+def same(first, second):
+    if isinstance(first, str) or isinstance(second, str):
+        return first == second
+    return first.equals(second)
+
+
+def main(arguments):
+    cache, keys, report_parser = open_corpus(arguments)
+    parsers = [IncomeStatementParser(), BalanceSheetParser(), CashFlowParser()]
+    differences = 0
+    print(f"{'filing':<40}{'nodes':>9}{'selective':>11}{'full (s)':>10}{'sel. (s)':>10}{'full (MB)':>11}"
+          f"{'sel. (MB)':>11}{'same':>6}")
+    for name, content in iter_filings(cache, keys):
+        report_content, content_type = report_parser._get_report_content(content)
+        if content_type != "html":
+            continue
+        full, full_nodes, full_time, full_peak = build(report_content, False)
+        selective, selective_nodes, selective_time, selective_peak = build(report_content, True)
+        full_outputs = outputs(parsers, full)
+        selective_outputs = outputs(parsers, selective)
+        equal = all(same(full_outputs[parser], selective_outputs[parser]) for parser in full_outputs)
+        differences += not equal
+        print(f"{name:<40}{full_nodes:>9}{selective_nodes:>11}{full_time:>10.3f}"
+              f"{selective_time:>10.3f}{full_peak / 2 ** 20:>11.1f}{selective_peak / 2 ** 20:>11.1f}{str(equal):>6}")
+    return differences
+
+
+if __name__ == '__main__':
+    # usage: python benchmarks/selective_parse_benchmark.py [filing cache folder]
+    # tree construction with and without the selective markup stripping, and whether the statements still match
+    sys.exit(1 if main(sys.argv[1:]) else 0)
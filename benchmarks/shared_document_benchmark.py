@@ -0,0 +1,60 @@
+import sys
+import time
+import tracemalloc
+import contextlib
+import io
+
+from sec_edgar import BalanceSheetParser
+from sec_edgar import CashFlowParser
+from sec_edgar import IncomeStatementParser
+from sec_edgar import ParsedDocument
+
+from corpus import iter_filings
+from corpus import open_corpus
+
+
+def run_parsers(parsers, report_content, content_type, shared):
+    document = ParsedDocument(report_content, content_type) if shared else report_content
+    for parser in parsers:
+        try:
+            parser.parse(document, content_type)
+        except Exception:
+            pass
+
+
+def measure(parsers, report_content, content_type, shared):
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_parsers(parsers, report_content, content_type, shared)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(arguments):
+    cache, keys, report_parser = open_corpus(arguments)
+    parsers = [IncomeStatementParser(), BalanceSheetParser(), CashFlowParser()]
+    totals = {False: [0.0, 0], True: [0.0, 0]}
+    print(f"{'filing':<40}{'before (s)':>12}{'after (s)':>12}{'before (MB)':>14}{'after (MB)':>14}")
+    filings = 0
+    for name, content in iter_filings(cache, keys):
+        filings += 1
+        report_content, content_type = report_parser._get_report_content(content)
+        results = {}
+        for shared in (False, True):
+            results[shared] = measure(parsers, report_content, content_type, shared)
+            totals[shared][0] += results[shared][0]
+            totals[shared][1] = max(totals[shared][1], results[shared][1])
+        print(f"{name:<40}{results[False][0]:>12.3f}{results[True][0]:>12.3f}"
+              f"{results[False][1] / 2 ** 20:>14.1f}{results[True][1] / 2 ** 20:>14.1f}")
+    if filings:
+        print(f"{'mean time, max peak':<40}{totals[False][0] / filings:>12.3f}{totals[True][0] / filings:>12.3f}"
+              f"{totals[False][1] / 2 ** 20:>14.1f}{totals[True][1] / 2 ** 20:>14.1f}")
+
+
+if __name__ == '__main__':
+    # usage: python benchmarks/shared_document_benchmark.py [filing cache folder]
+    # runs on the submissions already cached by ReportParser
+    main(sys.argv[1:])
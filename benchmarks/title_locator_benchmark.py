@@ -0,0 +1,51 @@
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from sec_edgar import Parser
+from sec_edgar.locator import TITLE_SPECS
+from sec_edgar.locator import locate_titles
+
+from corpus import iter_filings
+from corpus import open_corpus
+
+
+def reference_titles(soup):
+    # one soup.find per spec through Parser._find_multiple_words, what the statement parsers used to run
+    parser = Parser()
+    return {name: soup.find(lambda tag: parser._find_multiple_words(tag, **spec.arguments)) for name, spec in
+            TITLE_SPECS.items()}
+
+
+def main(arguments):
+    cache, keys, report_parser = open_corpus(arguments)
+    totals = [0.0, 0.0]
+    mismatches = 0
+    print(f"{'filing':<40}{'reference (s)':>15}{'locator (s)':>13}{'mismatches':>12}")
+    for name, content in iter_filings(cache, keys):
+        report_content, content_type = report_parser._get_report_content(content)
+        if content_type != "html":
+            continue
+        soup = BeautifulSoup(report_content, "lxml")
+        start = time.perf_counter()
+        expected = reference_titles(soup)
+        reference_time = time.perf_counter() - start
+        start = time.perf_counter()
+        located = locate_titles(soup)
+        locator_time = time.perf_counter() - start
+        different = [name for name in TITLE_SPECS if located[name] is not expected[name]]
+        for name in different:
+            print(f"  {name}: expected {expected[name]!r:.80}, located {located[name]!r:.80}")
+        mismatches += len(different)
+        totals[0] += reference_time
+        totals[1] += locator_time
+        print(f"{name:<40}{reference_time:>15.3f}{locator_time:>13.3f}{len(different):>12}")
+    print(f"{'total':<40}{totals[0]:>15.3f}{totals[1]:>13.3f}{mismatches:>12}")
+    return mismatches
+
+
+if __name__ == '__main__':
+    # usage: python benchmarks/title_locator_benchmark.py [filing cache folder]
+    # runs on the submissions already cached by ReportParser, exits non zero when the locator disagrees
+    sys.exit(1 if main(sys.argv[1:]) else 0)
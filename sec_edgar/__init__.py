@@ -1,3 +1,15 @@
+from sec_edgar.document import ParsedDocument
+from sec_edgar.statement import Statement
+from sec_edgar.statement import StatementPanel
+from sec_edgar.rate_limiter import RateLimiter
+from sec_edgar.fetcher import Fetcher
+from sec_edgar.http_cache import HttpCache
+from sec_edgar.filing_cache import FilingCache
+from sec_edgar.filing_index import FilingIndex
+from sec_edgar.filing_index import QuarterIndex
+from sec_edgar.result_cache import ResultCache
+from sec_edgar.run_ledger import RunLedger
+from sec_edgar.scheduler import ReportScheduler
 from sec_edgar.parser import Parser
 from sec_edgar.balance_sheet_parser import BalanceSheetParser
 from sec_edgar.cash_flow_parser import CashFlowParser
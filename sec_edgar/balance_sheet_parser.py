@@ -3,38 +3,20 @@ import re
 import pandas as pd
 
 from sec_edgar import Parser
+from sec_edgar.raw_text import BALANCE_SHEET
+from sec_edgar.raw_text import CASH_FLOW
+from sec_edgar.raw_text import INCOME_STATEMENT
 
 
 class BalanceSheetParser(Parser):
+    needs_xbrl = True
+    xbrl_role = re.compile(r"BALANCESHEET|FINANCIALPOSITION|FINANCIALCONDITION")
 
-    def _find_relevant_lines(self, clean_lines):
-        start_index = -1
-        end_index = -1
-        in_page = False
-        in_index = False
-        there_were_pages = False
-        for i, line in enumerate(clean_lines):
-            if in_index and "<PAGE>".lower() in line.lower():
-                in_index = False
-                continue
-            if "<PAGE>".lower() in line.lower():
-                in_page = True
-                if not there_were_pages:
-                    there_were_pages = True
-                continue
-            if "INDEX".lower() == line.lower() and in_page:
-                in_index = True
-                continue
-            if not in_index and (in_page or not there_were_pages):
-                if start_index == -1 and self._find_balance_sheet_title(line) is not None:
-                    start_index = i
-                if start_index != -1 and self._find_cash_flow_title(line) is not None:
-                    end_index = i
-                    break
-                if start_index != -1 and self._find_income_sheet_title(line) is not None:
-                    end_index = i
-                    break
-        return start_index, end_index
+    def _find_relevant_lines(self, raw_lines):
+        start_index = raw_lines.first_title([BALANCE_SHEET])
+        if start_index == -1:
+            return -1, -1
+        return start_index, raw_lines.first_title([CASH_FLOW, INCOME_STATEMENT], start_index)
 
     def _find_table_beginning(self, line):
         found_reg = re.search(
@@ -50,40 +32,16 @@ class BalanceSheetParser(Parser):
         df = self._combine_with_next_if_exists(df, r"Short-term.*\(net.*(?<!\))$", regex=True)
         return df
 
-    def _find_tables_and_info(self, soup):
-        first_item = soup.find(
-            lambda tag: self._find_multiple_words(tag, ["CONSOLIDATED"],
-                                                  ["FINANCIAL POSITION", "BALANCE SHEET",
-                                                   "BALANCE\nSHEET"],
-                                                  with_tag={"p", "b", "font", "div", "span", "a"}))
+    def _find_tables_and_info(self, document):
+        first_item = document.titles["balance_sheet"]
         if not first_item:
             raise Exception("Couldn't find the beginning of the balance sheet")
-        second_item = soup.find(
-            lambda tag: self._find_multiple_words(tag, ["CONSOLIDATED", "STATEMENT", "CASH", "FLOWS"],
-                                                  words_not_to_include=["CONTINUED"],
-                                                  with_tag={"p", "b", "font", "div", "span",
-                                                            "a"}) or self._find_multiple_words(tag, ["CONSOLIDATED",
-                                                                                                     "STATEMENT"],
-                                                                                               ["INCOME", "EARNINGS",
-                                                                                                "OPERATIONS"],
-                                                                                               ["COMPREHENSIVE",
-                                                                                                "CONTINUED"],
-                                                                                               with_tag={"p", "b",
-                                                                                                         "font",
-                                                                                                         "span", "div",
-                                                                                                         "a"}) or self._find_multiple_words(
-                tag, ["CONSOLIDATED", "STATEMENT", "SHAREHOLDERS’", "EQUITY"],
-                with_tag={"p", "b", "font", "div", "span", "a"}))
-        if self._is_element_before(first_item, second_item) or second_item is None:
+        second_item = document.titles.first("consolidated_cash_flows", "earnings_or_operations_statement",
+                                            "shareholders_equity")
+        if self._is_element_before(document, first_item, second_item) or second_item is None:
             print("the last element is before the first")
-            second_item = soup.find(
-                lambda tag: self._find_multiple_words(tag, ["CONSOLIDATED", "STATEMENT", "CASH", "FLOWS"],
-                                                      words_not_to_include=["CONTINUED"],
-                                                      with_tag={"p", "b", "font", "div", "span",
-                                                                "a"}) or self._find_multiple_words(
-                    tag, ["CONSOLIDATED", "STATEMENT", "EQUITY"],
-                    with_tag={"p", "b", "font", "div", "span", "a"}))
-        tables, period, end_date = self._get_elements_between_tags(first_item, second_item, "table")
+            second_item = document.titles.first("consolidated_cash_flows", "equity")
+        tables, period, end_date = self._get_elements_between_tags(document, first_item, second_item, "table")
         if not tables or len(tables) > 2:
             raise Exception("Couldn't find the balance sheet table(s)")
         return tables, period, end_date
@@ -91,7 +49,6 @@ class BalanceSheetParser(Parser):
     def _parse_html(self, tables, period=None, end_date=None):
         dfs = []
         for table in tables:
-            table_html = str(table)
-            df = self.parse_table(table_html)
+            df = self.parse_table(table)
             dfs.append(df)
         return pd.concat(dfs)
@@ -0,0 +1,98 @@
+import re
+from bisect import bisect_left
+from bisect import bisect_right
+
+from bs4 import BeautifulSoup
+
+from sec_edgar.locator import locate_titles
+from sec_edgar.raw_text import RawLines
+
+# markup that never holds a statement title or table: the head, scripts, styles, comments and the hidden inline XBRL
+# header with its contexts and units, often the bulk of a modern filing's nodes
+_UNUSED_MARKUP = re.compile(r"<(head|script|style|ix:header)\b.*?</\1\s*>|<!--.*?-->", re.IGNORECASE | re.DOTALL)
+
+
+def strip_unused_markup(content):
+    return _UNUSED_MARKUP.sub("", content)
+
+
+class DocumentOrder(object):
+    # pre-order position of every node, the order .next and .previous walk the tree in, so ordering two elements is
+    # an integer comparison and "every <table> between two titles" is a range query
+    def __init__(self, soup):
+        self.nodes = list(soup.descendants)
+        self._positions = {id(node): i for i, node in enumerate(self.nodes)}
+        # position of the last node in each subtree, children come after their parent so walking backwards
+        # propagates it up in one pass
+        self._ends = list(range(len(self.nodes)))
+        for i in range(len(self.nodes) - 1, -1, -1):
+            parent_position = self._positions.get(id(self.nodes[i].parent))
+            if parent_position is not None and self._ends[i] > self._ends[parent_position]:
+                self._ends[parent_position] = self._ends[i]
+        self._named = {}
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def position(self, node):
+        return self._positions[id(node)]
+
+    def subtree_end(self, position):
+        return self._ends[position]
+
+    def named(self, name):
+        # sorted positions of the tags called `name`
+        if name not in self._named:
+            self._named[name] = [i for i, node in enumerate(self.nodes) if node.name == name]
+        return self._named[name]
+
+    def named_between(self, name, start, stop):
+        positions = self.named(name)
+        return positions[bisect_left(positions, start):bisect_left(positions, stop)]
+
+    def contains_named(self, position, name):
+        # whether the subtree under `position` has a descendant called `name`, like tag.find(name) is not None
+        positions = self.named(name)
+        i = bisect_right(positions, position)
+        return i < len(positions) and positions[i] <= self._ends[position]
+
+
+class ParsedDocument(object):
+    def __init__(self, content, type, facts=None, selective=True):
+        self.content = content
+        self.type = type
+        # when set, the tree is built without the markup strip_unused_markup drops
+        self.selective = selective
+        # XbrlFacts of the filing when it carries XBRL, statement parsers read them before any html heuristics
+        self.facts = facts
+        self._soup = None
+        self._titles = None
+        self._order = None
+        self._raw_lines = None
+
+    @property
+    def soup(self):
+        # built lazily and only once, so every statement parser walks the same tree
+        if self._soup is None:
+            self._soup = BeautifulSoup(strip_unused_markup(self.content) if self.selective else self.content, "lxml")
+        return self._soup
+
+    @property
+    def titles(self):
+        # every statement title located in a single walk, shared by all the parsers
+        if self._titles is None:
+            self._titles = locate_titles(self.soup)
+        return self._titles
+
+    @property
+    def order(self):
+        if self._order is None:
+            self._order = DocumentOrder(self.soup)
+        return self._order
+
+    @property
+    def raw_lines(self):
+        # the raw text path's normalized lines and statement title positions, built once for every parser
+        if self._raw_lines is None:
+            self._raw_lines = RawLines(self.content)
+        return self._raw_lines
@@ -0,0 +1,131 @@
+import os
+import queue
+import re
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from sec_edgar import RateLimiter
+from sec_edgar.rate_limiter import THROTTLED_STATUSES
+
+SEC_URL = "https://www.sec.gov"
+# SEC's fair access policy wants every client to name itself with a contact email and answers anonymous ones with 403
+USER_AGENT_ENV = "SEC_EDGAR_USER_AGENT"
+_EMAIL = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+
+_DONE = object()
+
+
+class Fetcher(object):
+    def __init__(self, base_url=SEC_URL, connections=4, timeout=30, user_agent=None, rate_limiter=None):
+        # base_url lets the whole client run against a local stand-in serving EDGAR-shaped paths
+        user_agent = user_agent or os.environ.get(USER_AGENT_ENV)
+        if not user_agent or _EMAIL.search(user_agent) is None:
+            raise ValueError(f"SEC requires a User-Agent with a contact email, pass one like "
+                             f"Fetcher(user_agent=\"Sample Company admin@example.com\") or set {USER_AGENT_ENV}")
+        self.base_url = base_url.rstrip("/")
+        self.connections = connections
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.rate_limiter = rate_limiter or RateLimiter.shared()
+        self._session = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # sessions and locks don't cross process boundaries, every worker opens its own pool
+        state = self.__dict__.copy()
+        state["_session"] = None
+        del state["_lock"]
+        # a limiter's process shared lock only reaches workers through the pool initializer (see
+        # RateLimiter.set_shared), the fetcher carries the key to find it there
+        state["rate_limiter"] = self.rate_limiter.key
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self.rate_limiter = RateLimiter.registered(self.rate_limiter)
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.connections, pool_block=True)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    session.headers.update({"User-Agent": self.user_agent, "Accept-Encoding": "gzip, deflate"})
+                    self._session = session
+        return self._session
+
+    def url(self, url):
+        if url.startswith(SEC_URL):
+            return f"{self.base_url}{url[len(SEC_URL):]}"
+        return url
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        while True:
+            with self.rate_limiter:
+                try:
+                    response = self.session.get(self.url(url), **kwargs)
+                except requests.RequestException as e:
+                    raise ConnectionError(f"Couldn't get {url}") from e
+            if response.status_code == 403:
+                # not throttling, retrying would only halve everyone's rate while every request keeps failing
+                response.close()
+                raise PermissionError(f"SEC refused {url} (403), check that the User-Agent {self.user_agent!r} "
+                                      f"names you with a contact email")
+            if response.status_code not in THROTTLED_STATUSES:
+                self.rate_limiter.succeeded()
+                return response
+            if attempt >= self.rate_limiter.max_retries:
+                return response
+            response.close()
+            self.rate_limiter.throttled(attempt)
+            attempt += 1
+
+    def iter_fetch(self, items, fetch, workers=None, max_queued=16):
+        # keeps `workers` (by default `connections`) fetches in flight and hands (item, result, error) to the caller in completion
+        # order, the bounded queue stops downloads from running too far ahead of the consumer
+        items = iter(items)
+        items_lock = threading.Lock()
+        results = queue.Queue(max_queued)
+        stopped = threading.Event()
+
+        def put(result):
+            while not stopped.is_set():
+                try:
+                    results.put(result, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+
+        def worker():
+            while not stopped.is_set():
+                with items_lock:
+                    item = next(items, _DONE)
+                if item is _DONE:
+                    break
+                try:
+                    put((item, fetch(item), None))
+                except Exception as e:
+                    put((item, None, e))
+            put(_DONE)
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers or self.connections)]
+        for thread in threads:
+            thread.start()
+        finished = 0
+        try:
+            while finished < len(threads):
+                result = results.get()
+                if result is _DONE:
+                    finished += 1
+                    continue
+                yield result
+        finally:
+            stopped.set()
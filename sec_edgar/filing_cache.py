@@ -0,0 +1,163 @@
+import contextlib
+import gzip
+import hashlib
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+
+
+class FilingCache(object):
+    def __init__(self, folder, max_bytes=None, compress_level=6):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        os.makedirs(folder, exist_ok=True)
+        self._db_path = os.path.join(folder, "filing_cache.sqlite")
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._connection = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_connection"] = None
+        del state["_lock"]
+        del state["_flights"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            connection = sqlite3.connect(self._db_path, timeout=60, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, path TEXT, size INTEGER, accessed REAL)")
+            connection.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            connection.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER)")
+            connection.execute("INSERT OR IGNORE INTO stats VALUES ('total_size', 0)")
+            self._connection = connection
+        return self._connection
+
+    @staticmethod
+    def key(url):
+        return url.split("/Archives/", 1)[-1]
+
+    def _relative_path(self, key):
+        # <filer id>/<year>/<accession>/<sha1 of key>.gz keeps every directory small even at full-universe scale
+        digest = hashlib.sha1(key.encode("utf8")).hexdigest()
+        found = re.search(r"(\d{10})-?(\d{2})-?(\d{6})", key)
+        if found is None:
+            return os.path.join("other", digest[:2], f"{digest}.gz")
+        filer_id, year, sequence = found.groups()
+        return os.path.join(filer_id, year, f"{filer_id}-{year}-{sequence}", f"{digest}.gz")
+
+    def __contains__(self, key):
+        with self._lock:
+            row = self.connection.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone()
+        return row is not None
+
+    def open(self, key):
+        with self._lock:
+            row = self.connection.execute("SELECT path FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self.connection.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+        try:
+            return gzip.open(os.path.join(self.folder, row[0]), "rt", encoding="utf8")
+        except FileNotFoundError:
+            self._remove([key])
+            return None
+
+    @contextlib.contextmanager
+    def single_flight(self, key):
+        # callers of the same key in this process queue behind the first one, which downloads and writes the entry
+        # while the others find it in the cache once they get the lock
+        with self._lock:
+            lock, waiters = self._flights.get(key, (None, 0))
+            lock = lock or threading.Lock()
+            self._flights[key] = (lock, waiters + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._lock:
+                lock, waiters = self._flights[key]
+                if waiters == 1:
+                    del self._flights[key]
+                else:
+                    self._flights[key] = (lock, waiters - 1)
+
+    @contextlib.contextmanager
+    def writer(self, key):
+        # writes go to a temporary file next to the target and are renamed into place only once complete,
+        # a worker dying half way leaves no entry behind
+        relative_path = self._relative_path(key)
+        path = os.path.join(self.folder, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf8",
+                                                       compresslevel=self.compress_level) as f:
+                yield f
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self._add(key, relative_path, os.path.getsize(path))
+
+    def _add(self, key, relative_path, size):
+        with self._lock:
+            connection = self.connection
+            connection.execute("BEGIN IMMEDIATE")
+            previous = connection.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            connection.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                               (key, relative_path, size, time.time()))
+            connection.execute("UPDATE stats SET value = value + ? WHERE name = 'total_size'",
+                               (size - (previous[0] if previous else 0),))
+            connection.execute("COMMIT")
+        self.evict()
+
+    def _remove(self, keys):
+        with self._lock:
+            connection = self.connection
+            connection.execute("BEGIN IMMEDIATE")
+            for key in keys:
+                row = connection.execute("SELECT path, size FROM entries WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    continue
+                connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                connection.execute("UPDATE stats SET value = value - ? WHERE name = 'total_size'", (row[1],))
+                path = os.path.join(self.folder, row[0])
+                if os.path.exists(path):
+                    os.remove(path)
+            connection.execute("COMMIT")
+
+    @property
+    def size(self):
+        with self._lock:
+            return self.connection.execute("SELECT value FROM stats WHERE name = 'total_size'").fetchone()[0]
+
+    def evict(self):
+        if self.max_bytes is None:
+            return
+        excess = self.size - self.max_bytes
+        while excess > 0:
+            with self._lock:
+                rows = self.connection.execute("SELECT key, size FROM entries ORDER BY accessed LIMIT 100").fetchall()
+            if not rows:
+                break
+            keys = []
+            for key, size in rows:
+                if excess <= 0:
+                    break
+                keys.append(key)
+                excess -= size
+            self._remove(keys)
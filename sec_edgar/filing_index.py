@@ -0,0 +1,137 @@
+import itertools
+import sqlite3
+import threading
+import time
+
+ARCHIVES_URL = "https://www.sec.gov/Archives/"
+
+
+def iter_master_idx(lines, form_types=None):
+    # yields (cik, company, form_type, date_filed, filename) straight off a master.idx text or byte line stream
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf8", errors="ignore")
+        line = line.rstrip("\r\n")
+        if not line.endswith(".txt") or line.startswith("CIK"):
+            continue
+        fields = line.split("|")
+        if len(fields) == 5 and (form_types is None or fields[2] in form_types):
+            yield tuple(fields)
+
+
+class FilingIndex(object):
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS filings (filename TEXT PRIMARY KEY, cik INTEGER, company TEXT, "
+            "form_type TEXT, date_filed TEXT, year INTEGER, quarter INTEGER)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS filings_cik ON filings (cik, form_type, date_filed)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS filings_form ON filings (form_type, date_filed)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS filings_quarter ON filings (year, quarter, form_type)")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS quarters (year INTEGER, quarter INTEGER, loaded REAL, "
+            "PRIMARY KEY (year, quarter))")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        self._connection.commit()
+
+    def get_meta(self, name, default=None):
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return default if row is None else row[0]
+
+    def set_meta(self, name, value):
+        with self._lock:
+            with self._connection:
+                self._connection.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (name, value))
+
+    def has_quarter(self, year, quarter):
+        return self.quarter_loaded(year, quarter) is not None
+
+    def quarter_loaded(self, year, quarter):
+        # the time the quarter's master.idx was last loaded or revalidated, None when it never was
+        with self._lock:
+            row = self._connection.execute("SELECT loaded FROM quarters WHERE year = ? AND quarter = ?",
+                                           (year, quarter)).fetchone()
+        return None if row is None else row[0]
+
+    def add_quarter(self, year, quarter, rows, chunk_size=10000):
+        # the quarter is marked loaded only once all of its rows are in
+        self.add_filings(year, quarter, rows, chunk_size)
+        self.mark_quarter(year, quarter)
+
+    def mark_quarter(self, year, quarter):
+        with self._lock:
+            with self._connection:
+                self._connection.execute("INSERT OR REPLACE INTO quarters VALUES (?, ?, ?)",
+                                         (year, quarter, time.time()))
+
+    def add_filings(self, year, quarter, rows, chunk_size=10000):
+        # rows are (cik, company, form_type, date_filed, filename) as listed in a master.idx, they may come
+        # straight off the download so the lock is only held per chunk
+        rows = iter(rows)
+        while True:
+            chunk = [(filename, int(cik), company, form_type, date_filed, year, quarter) for
+                     cik, company, form_type, date_filed, filename in itertools.islice(rows, chunk_size)]
+            if not chunk:
+                break
+            with self._lock:
+                with self._connection:
+                    self._connection.executemany("INSERT OR REPLACE INTO filings VALUES (?, ?, ?, ?, ?, ?, ?)", chunk)
+
+    def files(self, cik, form_type, year=None, quarter=None):
+        sql = "SELECT filename FROM filings WHERE cik = ? AND form_type = ?"
+        parameters = [int(cik), form_type]
+        if year is not None:
+            sql += " AND year = ? AND quarter = ?"
+            parameters += [year, quarter]
+        with self._lock:
+            rows = self._connection.execute(f"{sql} ORDER BY rowid", parameters).fetchall()
+        return [f"{ARCHIVES_URL}{filename}" for filename, in rows]
+
+    def query(self, ciks=None, form_types=None, since=None, until=None):
+        # cross-quarter lookups, e.g. every 10-K of a set of companies since 2001
+        conditions = []
+        parameters = []
+        for column, values in (("cik", ciks), ("form_type", form_types)):
+            if values is not None:
+                values = list(values)
+                conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+                parameters += [int(value) for value in values] if column == "cik" else values
+        if since is not None:
+            conditions.append("date_filed >= ?")
+            parameters.append(str(since))
+        if until is not None:
+            conditions.append("date_filed <= ?")
+            parameters.append(str(until))
+        sql = "SELECT cik, company, form_type, date_filed, filename FROM filings"
+        if conditions:
+            sql += f" WHERE {' AND '.join(conditions)}"
+        with self._lock:
+            rows = self._connection.execute(f"{sql} ORDER BY date_filed, rowid", parameters).fetchall()
+        return [(cik, company, form_type, date_filed, f"{ARCHIVES_URL}{filename}") for
+                cik, company, form_type, date_filed, filename in rows]
+
+
+class QuarterIndex(object):
+    # read-only "<CIK>_<Form Type>" -> [file urls] view of one quarter, every lookup is a single indexed query
+    def __init__(self, filing_index, year, quarter):
+        self._filing_index = filing_index
+        self.year = year
+        self.quarter = quarter
+
+    def get(self, key, default=None):
+        cik, form_type = key.split("_", 1)
+        files = self._filing_index.files(cik, form_type, self.year, self.quarter)
+        return files or default
+
+    def __getitem__(self, key):
+        files = self.get(key)
+        if files is None:
+            raise KeyError(key)
+        return files
+
+    def __contains__(self, key):
+        return self.get(key) is not None
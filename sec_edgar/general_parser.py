@@ -1,9 +1,15 @@
 import re
 from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 from sec_edgar import Parser
+from sec_edgar import ParsedDocument
+
+
+SHARES_OUTSTANDING = "dei:EntityCommonStockSharesOutstanding"
 
 
 class GeneralParser(Parser):
+    needs_xbrl = True
 
     def get_num_of_shares(self, xml_content, type):
         if type == "html":
@@ -13,13 +19,21 @@ class GeneralParser(Parser):
             if not found:
                 found = re.findall("([\d,]+) ?\n?shares ?\n?of ?\n?common ?\n?stock", xml_content)
         else:
-            soup = BeautifulSoup(xml_content, parser="lxml", features="lxml")
-            found = soup.find(attrs={"name": "dei:EntityCommonStockSharesOutstanding"}).contents
+            # only the element holding the value is built, the rest of the document is skipped while parsing
+            soup = BeautifulSoup(xml_content, features="lxml",
+                                 parse_only=SoupStrainer(attrs={"name": SHARES_OUTSTANDING}))
+            found = soup.find(attrs={"name": SHARES_OUTSTANDING}).contents
         if len(found) > 0:
             return int(found[0].replace(",", ""))
         else:
             raise Exception("Failed to find number of shares")
 
     def parse(self, content, type):
+        if isinstance(content, ParsedDocument):
+            if content.facts is not None:
+                num_of_shares = content.facts.value(SHARES_OUTSTANDING)
+                if num_of_shares is not None:
+                    return {"num_of_shares": int(num_of_shares)}
+            content, type = content.content, content.type
         num_of_shares = self.get_num_of_shares(content, type)
         return {"num_of_shares": num_of_shares}
@@ -0,0 +1,64 @@
+import gzip
+import sqlite3
+import threading
+import time
+
+
+class HttpCache(object):
+    def __init__(self, path, fetcher):
+        self.path = path
+        self._fetcher = fetcher
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+            "fetched REAL, body BLOB)")
+        self._connection.commit()
+
+    def _entry(self, url):
+        with self._lock:
+            return self._connection.execute("SELECT etag, last_modified, fetched, body FROM responses WHERE url = ?",
+                                            (url,)).fetchone()
+
+    def conditional_get(self, url, **kwargs):
+        # sends the stored validators, the caller gets a 304 when nothing changed since the last `store`
+        entry = self._entry(url)
+        headers = dict(kwargs.pop("headers", {}))
+        if entry is not None:
+            etag, last_modified = entry[:2]
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        return self._fetcher.get(url, headers=headers, **kwargs)
+
+    def store(self, url, response, body=None):
+        # validators are only stored once the caller has fully consumed the response
+        compressed_body = gzip.compress(body) if body is not None else None
+        with self._lock:
+            with self._connection:
+                self._connection.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                                         (url, response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                                          time.time(), compressed_body))
+
+    def touch(self, url):
+        with self._lock:
+            with self._connection:
+                self._connection.execute("UPDATE responses SET fetched = ? WHERE url = ?", (time.time(), url))
+
+    def get(self, url, ttl=None):
+        # returns the body, served from the cache while younger than `ttl` seconds (None never expires) and
+        # revalidated with a conditional request afterwards
+        entry = self._entry(url)
+        if entry is not None and entry[3] is not None:
+            if ttl is None or time.time() - entry[2] < ttl:
+                return gzip.decompress(entry[3])
+        response = self.conditional_get(url)
+        if response.status_code == 304 and entry is not None and entry[3] is not None:
+            self.touch(url)
+            return gzip.decompress(entry[3])
+        if response.status_code != 200:
+            raise ConnectionError(f"Couldn't get {url}")
+        self.store(url, response, response.content)
+        return response.content
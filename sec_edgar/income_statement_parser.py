@@ -4,38 +4,23 @@ from word2number import w2n
 import pandas as pd
 
 from sec_edgar import Parser
+from sec_edgar.raw_text import BALANCE_SHEET
+from sec_edgar.raw_text import CASH_FLOW
+from sec_edgar.raw_text import INCOME_STATEMENT
+from sec_edgar.table_grid import table_to_grid
 
 
 class IncomeStatementParser(Parser):
+    needs_xbrl = True
+    # "comprehensive income" is a statement of its own
+    xbrl_role = re.compile(r"^(?!.*COMPREHENSIVE).*(?:STATEMENTS?OF(?:CONSOLIDATED)?(?:OPERATIONS|INCOME|EARNINGS)|"
+                           r"(?:OPERATIONS|INCOME|EARNINGS)STATEMENTS?)")
 
-    def _find_relevant_lines(self, clean_lines):
-        start_index = -1
-        end_index = -1
-        in_page = False
-        in_index = False
-        there_were_pages = False
-        for i, line in enumerate(clean_lines):
-            if in_index and "<PAGE>".lower() in line.lower():
-                in_index = False
-                continue
-            if "<PAGE>".lower() in line.lower():
-                in_page = True
-                if not there_were_pages:
-                    there_were_pages = True
-                continue
-            if "INDEX".lower() == line.lower() and in_page:
-                in_index = True
-                continue
-            if not in_index and (in_page or not there_were_pages):
-                if start_index == -1 and self._find_income_sheet_title(line) is not None:
-                    start_index = i
-                if start_index != -1 and self._find_balance_sheet_title(line) is not None:
-                    end_index = i
-                    break
-                if start_index != -1 and self._find_cash_flow_title(line) is not None:
-                    end_index = i
-                    break
-        return start_index, end_index
+    def _find_relevant_lines(self, raw_lines):
+        start_index = raw_lines.first_title([INCOME_STATEMENT])
+        if start_index == -1:
+            return -1, -1
+        return start_index, raw_lines.first_title([BALANCE_SHEET, CASH_FLOW], start_index)
 
     def _find_table_beginning(self, line):
         if re.search(r".*(\w+) months(?: ended)?.*", line, re.IGNORECASE):
@@ -54,31 +39,15 @@ class IncomeStatementParser(Parser):
         df = self._combine_with_next_if_exists(df, "^Income from continuing operations before$", regex=True)
         return df
 
-    def _find_tables_and_info(self, soup):
-        first_item = soup.find(
-            lambda tag: self._find_multiple_words(tag, ["CONSOLIDATED", "STATEMENT"],
-                                                  ["INCOME", "EARNING", "OPERATION"],
-                                                  ["COMPREHENSIVE", "CONTINUED"],
-                                                  with_tag={"p", "b", "font", "span", "div", "a"},
-                                                  exact_phrases={"Statement of Results of Operations"}))
+    def _find_tables_and_info(self, document):
+        first_item = document.titles["income_statement"]
         if not first_item:
             raise Exception("Couldn't find the beginning of the income sheet")
-        second_item = soup.find(
-            lambda tag: self._find_multiple_words(tag, ["CONSOLIDATED"],
-                                                  either=["FINANCIAL POSITION", "BALANCE SHEET", "BALANCE\nSHEET"],
-                                                  words_not_to_include=["CONTINUED"],
-                                                  with_tag={"p", "b", "font", "span",
-                                                            "div", "a"}))
-        if second_item is None or self._is_element_before(first_item, second_item):
+        second_item = document.titles["balance_sheet_not_continued"]
+        if second_item is None or self._is_element_before(document, first_item, second_item):
             print("the last element is before the first")
-            second_item = soup.find(
-                lambda tag: self._find_multiple_words(tag, ["CONSOLIDATED", "STATEMENT", "CASH", "FLOWS"],
-                                                      words_not_to_include=["CONTINUED"],
-                                                      with_tag={"p", "b", "font", "div", "span",
-                                                                "a"}) or self._find_multiple_words(
-                    tag, ["CONSOLIDATED", "STATEMENT", "EQUITY"],
-                    with_tag={"p", "b", "font", "div", "span", "a"},exact_phrases={"Statement of Changes in Stockholders' Equity"}))
-        tables, period, end_date = self._get_elements_between_tags(first_item, second_item, "table")
+            second_item = document.titles.first("consolidated_cash_flows", "changes_in_equity")
+        tables, period, end_date = self._get_elements_between_tags(document, first_item, second_item, "table")
         if not tables or len(tables) > 2:
             raise Exception("Couldn't find the income sheet table(s)")
         return tables, period, end_date
@@ -86,8 +55,8 @@ class IncomeStatementParser(Parser):
     def _parse_html(self, tables, period=None, end_date=None):
         dfs = []
         for table in tables:
-            table_html = str(table)
-            table_html = table_html.replace("Thre e", "Three")  # an issue with 2005
-            df = self.parse_table(table_html)
+            grid, header_rows = table_to_grid(table)
+            grid = [[cell.replace("Thre e", "Three") for cell in row] for row in grid]  # an issue with 2005
+            df = self.parse_table((grid, header_rows))
             dfs.append(df)
         return pd.concat(dfs)
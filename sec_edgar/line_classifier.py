@@ -0,0 +1,64 @@
+import re
+
+import dateutil.parser as dparser
+
+# kinds of table lines in the raw text path
+PAGE_BREAK = "page_break"
+HEADER = "header"
+SKIP = "skip"
+# a line without numbers dateutil's fuzzy parser accepts as a date, kept as a label only row
+DATE_ROW = "date_row"
+LABEL_AND_NUMBERS = "label_and_numbers"
+TEXT = "text"
+SKIPPED_KINDS = {PAGE_BREAK, HEADER, SKIP}
+
+_LEADERS = re.compile(r"[-.]{3,}")
+_PAGE_NUMBER = re.compile(r"- ?[0-9]+ ?-")
+_HEADER = re.compile(r"ITEM \d+\.|CONSOLIDATED STATEMENT OF EARNINGS|\w{3,9} \d{1,2}$|^\d{4}|Months")
+_NOTE = re.compile(r"restated|presentation|see accompanying", re.IGNORECASE)
+_LABEL_AND_NUMBERS = re.compile(r"\s+[0-9.()\-_]+\s+[0-9.()\-_$]+")
+
+# dateutil can only find a date in a line with a digit or a month or weekday name, "nan" and "inf" parse as numbers
+_DATE_HINT = re.compile(r"\d|(?<![a-z])(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|"
+                        r"sept?(?:ember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?|mon(?:day)?|tue(?:sday)?|"
+                        r"wed(?:nesday)?|thu(?:rsday)?|fri(?:day)?|sat(?:urday)?|sun(?:day)?|nan|inf(?:inity)?)"
+                        r"(?![a-z])", re.IGNORECASE)
+
+
+def clean_table_line(line):
+    return _LEADERS.sub("", line.replace("_", "").replace("=", "").replace(",", "").replace("*", "")).strip()
+
+
+def skip_kind(line):
+    # why a table line is dropped, None when it's kept. the old "(Unaudited)" in line.lower() check never matched
+    # and isn't carried over
+    if not line:
+        return SKIP
+    if line == "<PAGE>" or _PAGE_NUMBER.search(line) is not None:
+        return PAGE_BREAK
+    if _HEADER.search(line) is not None or (line.isupper() and ":" not in line):
+        return HEADER
+    if _NOTE.search(line) is not None or (line.startswith("(") and line.endswith(")")) or line.startswith("*"):
+        return SKIP
+    return None
+
+
+def classify_line(line):
+    # `line` is already cleaned with clean_table_line
+    kind = skip_kind(line)
+    if kind is not None:
+        return kind
+    if "." in line or _LABEL_AND_NUMBERS.search(line) is not None:
+        return LABEL_AND_NUMBERS
+    return DATE_ROW if is_fuzzy_date(line) else TEXT
+
+
+def is_fuzzy_date(line):
+    # dateutil's fuzzy parse only runs on the lines the cheap check can't rule out
+    if _DATE_HINT.search(line) is None:
+        return False
+    try:
+        dparser.parse(line, fuzzy=True)
+        return True
+    except:
+        return False
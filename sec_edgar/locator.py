@@ -0,0 +1,130 @@
+import re
+
+from bs4 import CData
+from bs4 import NavigableString
+from bs4 import Tag
+
+_WHITESPACE = re.compile(r"\s+")
+# the only string types Tag.text is made of
+_TEXT_TYPES = (NavigableString, CData)
+# longer texts are never titles, see Parser._find_multiple_words
+MAX_TITLE_LENGTH = 200
+_TITLE_TAGS = {"p", "b", "font", "div", "span", "a"}
+
+
+class TitleSpec(object):
+    # a precompiled Parser._find_multiple_words call, `arguments` are kept so the reference can be run on the same spec
+    def __init__(self, words=(), either=(), words_not_to_include=(), with_tag=(), exact_phrases=()):
+        self.arguments = {"words": list(words), "either": list(either),
+                          "words_not_to_include": list(words_not_to_include), "with_tag": set(with_tag),
+                          "exact_phrases": set(exact_phrases)}
+        self.words = [word.lower() for word in words]
+        self.either = [word.lower() for word in either]
+        self.words_not_to_include = [word.lower() for word in words_not_to_include]
+        self.with_tag = set(with_tag)
+        self.exact_phrases = set(exact_phrases)
+        self.structure = re.compile(rf"^{' '.join(words)}(?: OF)? (?:{'|'.join(either)})")
+
+    def matches(self, name, text, lower_text, content_count, in_table):
+        # same decisions in the same order as the reference, the per word regexes are plain substring checks there
+        if text in self.exact_phrases:
+            return True
+        if ((self.with_tag and name not in self.with_tag) or content_count > 1) and self.structure.search(
+                text) is None:
+            return False
+        if len(text) > MAX_TITLE_LENGTH:
+            return False
+        for word in self.words:
+            if word not in lower_text:
+                return False
+        for word in self.words_not_to_include:
+            if word in lower_text:
+                return False
+        if self.either and sum(word in lower_text for word in self.either) != 1:
+            return False
+        return not in_table
+
+
+TITLE_SPECS = {
+    "balance_sheet": TitleSpec(["CONSOLIDATED"], ["FINANCIAL POSITION", "BALANCE SHEET", "BALANCE\nSHEET"],
+                               with_tag=_TITLE_TAGS),
+    "balance_sheet_not_continued": TitleSpec(["CONSOLIDATED"],
+                                             ["FINANCIAL POSITION", "BALANCE SHEET", "BALANCE\nSHEET"],
+                                             ["CONTINUED"], with_tag=_TITLE_TAGS),
+    "income_statement": TitleSpec(["CONSOLIDATED", "STATEMENT"], ["INCOME", "EARNING", "OPERATION"],
+                                  ["COMPREHENSIVE", "CONTINUED"], with_tag=_TITLE_TAGS,
+                                  exact_phrases={"Statement of Results of Operations"}),
+    "earnings_or_operations_statement": TitleSpec(["CONSOLIDATED", "STATEMENT"],
+                                                  ["INCOME", "EARNINGS", "OPERATIONS"],
+                                                  ["COMPREHENSIVE", "CONTINUED"], with_tag=_TITLE_TAGS),
+    "consolidated_cash_flows": TitleSpec(["CONSOLIDATED", "STATEMENT", "CASH", "FLOWS"],
+                                         words_not_to_include=["CONTINUED"], with_tag=_TITLE_TAGS),
+    "cash_flow": TitleSpec(["STATEMENT", "CASH", "FLOW"], words_not_to_include=["CONTINUED"], with_tag=_TITLE_TAGS),
+    "shareholders_equity": TitleSpec(["CONSOLIDATED", "STATEMENT", "SHAREHOLDERS’", "EQUITY"],
+                                     with_tag=_TITLE_TAGS),
+    "equity": TitleSpec(["CONSOLIDATED", "STATEMENT", "EQUITY"], with_tag=_TITLE_TAGS),
+    "changes_in_equity": TitleSpec(["CONSOLIDATED", "STATEMENT", "EQUITY"], with_tag=_TITLE_TAGS,
+                                   exact_phrases={"Statement of Changes in Stockholders' Equity"}),
+}
+
+
+class TitleLocations(object):
+    def __init__(self, found):
+        # name -> (pre-order position, tag) of the first match
+        self._found = found
+
+    def __getitem__(self, name):
+        found = self._found.get(name)
+        return found[1] if found else None
+
+    def first(self, *names):
+        # the earliest tag matching any of `names`, like soup.find(lambda tag: a(tag) or b(tag))
+        found = [self._found[name] for name in names if name in self._found]
+        return min(found, key=lambda item: item[0])[1] if found else None
+
+
+def _non_whitespace_lengths(soup):
+    # non whitespace length of every tag's text, children come after their parent in pre-order so walking it
+    # backwards sums each subtree once
+    lengths = {}
+    for node in reversed(list(soup.descendants)):
+        if isinstance(node, Tag):
+            length = lengths.setdefault(id(node), 0)
+        elif type(node) in _TEXT_TYPES:
+            length = len(_WHITESPACE.sub("", node))
+        else:
+            continue
+        if node.parent is not None:
+            lengths[id(node.parent)] = lengths.get(id(node.parent), 0) + length
+    return lengths
+
+
+def _count_contents(tag):
+    return sum(1 for child in tag.children if child.name is not None and child.name != "br")
+
+
+def locate_titles(soup, specs=None):
+    # one pre-order walk finding the first match of every spec. only tags whose text has at most MAX_TITLE_LENGTH
+    # non whitespace characters can be titles, so the (subtree sized) normalized text is only built for those
+    specs = TITLE_SPECS if specs is None else specs
+    lengths = _non_whitespace_lengths(soup)
+    in_table = {id(soup): False}
+    found = {}
+    for position, tag in enumerate(soup.descendants):
+        if not isinstance(tag, Tag):
+            continue
+        parent = tag.parent
+        tag_in_table = in_table[id(parent)] or parent.name == "table"
+        in_table[id(tag)] = tag_in_table
+        length = lengths.get(id(tag), 0)
+        if not length or length > MAX_TITLE_LENGTH or tag.name in {"html", "body"}:
+            continue
+        text = _WHITESPACE.sub(" ", tag.text.strip())
+        lower_text = text.lower()
+        content_count = _count_contents(tag)
+        for name, spec in specs.items():
+            if name not in found and spec.matches(tag.name, text, lower_text, content_count, tag_in_table):
+                found[name] = (position, tag)
+        if len(found) == len(specs):
+            break
+    return TitleLocations(found)
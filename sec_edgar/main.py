@@ -1,9 +1,15 @@
 import traceback
 
+from datetime import date
 from datetime import datetime
-import requests
+from datetime import timedelta
+import io
 import os
 import json
+import threading
+import time
+import queue
+from concurrent.futures import Future
 from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
@@ -11,27 +17,48 @@ from tqdm import tqdm
 
 from sec_edgar import BalanceSheetParser
 from sec_edgar import CashFlowParser
+from sec_edgar import Fetcher
+from sec_edgar import FilingIndex
 from sec_edgar import GeneralParser
+from sec_edgar import HttpCache
 from sec_edgar import IncomeStatementParser
+from sec_edgar import QuarterIndex
+from sec_edgar import ReportScheduler
+from sec_edgar import RunLedger
 from sec_edgar import ReportParser
+from sec_edgar.filing_index import iter_master_idx
+
+REPORT_FORM_TYPES = {"10-Q", "10-K"}
+DAILY_HIGH_WATER_MARK = "daily_high_water_mark"
+TICKERS_URL = "https://www.sec.gov/files/company_tickers.json"
+# seconds before the tickers map and the still-growing current quarter's master.idx are revalidated
+TICKERS_TTL = 24 * 60 * 60
+QUARTER_INDEX_TTL = 6 * 60 * 60
 
 
 class SecEdgar(object):
     def __init__(self, symbols,
-                 output_folder=os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")):
+                 output_folder=os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"), fetcher=None):
         self._symbols = set(symbols)
         self._output_folder = output_folder
+        self._fetcher = fetcher or Fetcher()
         if output_folder is not None:
             if not os.path.exists(output_folder):
                 os.makedirs(output_folder)
-        self._ciks_map = self.get_cik(symbols)
+        self._ledger = RunLedger(os.path.join(output_folder, "run_ledger.sqlite"))
+        self._filing_index = FilingIndex(os.path.join(output_folder, "filing_index.sqlite"))
+        self._http_cache = HttpCache(os.path.join(output_folder, "http_cache.sqlite"), self._fetcher)
+        self._ciks_map = self.get_cik(symbols, self._fetcher, self._http_cache)
 
     @classmethod
-    def get_cik(cls, symbols=None):
-        url = "https://www.sec.gov/files/company_tickers.json"
-        response = requests.get(url)
-        if response.status_code == 200:
-            all_data = json.loads(response.content)
+    def get_cik(cls, symbols=None, fetcher=None, http_cache=None):
+        if http_cache is not None:
+            content = http_cache.get(TICKERS_URL, TICKERS_TTL)
+        else:
+            response = (fetcher or Fetcher()).get(TICKERS_URL)
+            content = response.content if response.status_code == 200 else None
+        if content is not None:
+            all_data = json.loads(content)
             if symbols is None:
                 symbol_to_cik_map = {all_data[i]["ticker"]: all_data[i]["cik_str"] for i in all_data}
             else:
@@ -41,54 +68,156 @@ class SecEdgar(object):
         else:
             raise Exception("Failed to get ticker company map")
 
+    @property
+    def filing_index(self):
+        return self._filing_index
+
     def get_quarter_index(self, year, quarter):
         if year < 1994:
             raise Exception("The earliest year accessible is 1994")
         print(f"Getting {year}-{quarter}")
-        output_path = os.path.join(self._output_folder, f"{year}_{quarter}.index.json")
-        if os.path.exists(output_path):
-            with open(output_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        url = f"https://www.sec.gov/Archives/edgar/full-index/{year}/QTR{quarter}/master.idx"
-        response = requests.get(url)
-        if response.status_code == 200:
-            output = self.get_reports_paths(response.content.decode("utf8", errors="ignore"))
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(output, f)
-            return output
-        else:
-            raise Exception(f"Failed to get data from {url}")
+        loaded = self._filing_index.quarter_loaded(year, quarter)
+        if loaded is None or not self._is_quarter_index_fresh(year, quarter, loaded):
+            url = f"https://www.sec.gov/Archives/edgar/full-index/{year}/QTR{quarter}/master.idx"
+            # validators only make sense for rows we still have, a rebuilt filing index must get the whole file even
+            # when the http cache remembers the quarter's ETag
+            if loaded is None:
+                response = self._fetcher.get(url, stream=True)
+            else:
+                response = self._http_cache.conditional_get(url, stream=True)
+            with response:
+                if response.status_code == 304 and loaded is not None:
+                    self._filing_index.mark_quarter(year, quarter)
+                elif response.status_code == 200:
+                    self._filing_index.add_quarter(year, quarter, self.get_index_rows(response.iter_lines()))
+                    self._http_cache.store(url, response)
+                else:
+                    raise Exception(f"Failed to get data from {url}")
+        return QuarterIndex(self._filing_index, year, quarter)
+
+    @staticmethod
+    def _is_quarter_index_fresh(year, quarter, loaded):
+        # a master.idx loaded a day after its quarter ended is final, the current quarter's keeps growing and is
+        # revalidated once it's older than QUARTER_INDEX_TTL
+        quarter_end = pd.Timestamp(year=year, month=quarter * 3, day=1).to_period("Q").end_time
+        if loaded >= (quarter_end + pd.Timedelta(days=1)).timestamp():
+            return True
+        return time.time() - loaded < QUARTER_INDEX_TTL
+
+    def get_index_rows(self, lines, form_types=None):
+        # every filing of the quarter (or only `form_types`) as (cik, company, form_type, date_filed, filename)
+        return iter_master_idx(lines, form_types)
 
     def get_reports_paths(self, master_idx):
-        content_lines = master_idx.splitlines()
-        data = []
-        for line in content_lines:
-            if line.startswith("CIK"):
-                columns = line.split("|")
-            else:
-                if line.endswith(".txt"):
-                    data.append(line.split("|"))
-        df = pd.DataFrame(data, columns=columns)
-        annual_and_quarterly_forms = df[(df["Form Type"] == "10-Q") | (df["Form Type"] == "10-K")]
-        annual_and_quarterly_forms["Filename"] = annual_and_quarterly_forms["Filename"].apply(
-            lambda x: f"https://www.sec.gov/Archives/{x}")
-        output = annual_and_quarterly_forms[["CIK", "Form Type", "Filename"]].groupby(by=["CIK", "Form Type"])[
-            "Filename"].apply(list).to_dict()
-        output = {"_".join(k): v for k, v in output.items()}
+        output = {}
+        for cik, _, form_type, _, filename in self.get_index_rows(io.StringIO(master_idx), REPORT_FORM_TYPES):
+            output.setdefault(f"{cik}_{form_type}", []).append(f"https://www.sec.gov/Archives/{filename}")
         return output
 
-    def get_specific_report(self, parser, symbol, quarter_index, report_type):
+    def _get_symbol_files(self, symbol, quarter_index, report_type):
         symbol_files = quarter_index.get(f"{self._ciks_map[symbol]}_{report_type}", None)
         if not symbol_files:
             raise KeyError(f"Couldn't find files for {symbol}")
+        return symbol_files
+
+    def get_specific_report(self, parser, symbol, quarter_index, report_type):
+        symbol_files = self._get_symbol_files(symbol, quarter_index, report_type)
         reports = []
         for symbol_file in symbol_files:
             report = parser.parse(symbol_file, save=True)
             reports.append(report)
         return reports
 
+    def _get_cik_reports(self, scheduler, cik, quarter_index, report_type):
+        # resolves once every filing of the cik is done, failing with the first failed filing in file order
+        future = Future()
+        cik_files = quarter_index.get(f"{cik}_{report_type}", None)
+        if not cik_files:
+            future.set_exception(KeyError(f"Couldn't find files for CIK {cik}"))
+            return future
+        file_futures = [scheduler.submit(cik_file) for cik_file in cik_files]
+        remaining = [len(file_futures)]
+        lock = threading.Lock()
+
+        def file_done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            for file_future in file_futures:
+                if file_future.exception() is not None:
+                    future.set_exception(file_future.exception())
+                    return
+            future.set_result([file_future.result() for file_future in file_futures])
+
+        for file_future in file_futures:
+            file_future.add_done_callback(file_done)
+        return future
+
+    def _get_symbols_reports(self, scheduler, symbols, quarter_index, report_type):
+        # tasks are scheduled once per cik and fanned out to every ticker mapping to it, so dual-class companies
+        # such as GOOG/GOOGL or BRK-A/BRK-B share one future instead of fetching the same filings twice
+        cik_futures = {}
+        symbol_futures = {}
+        for symbol in symbols:
+            if symbol not in self._ciks_map:
+                future = Future()
+                future.set_exception(KeyError(f"Couldn't find files for {symbol}"))
+            else:
+                cik = self._ciks_map[symbol]
+                if cik not in cik_futures:
+                    cik_futures[cik] = self._get_cik_reports(scheduler, cik, quarter_index, report_type)
+                future = cik_futures[cik]
+            symbol_futures[symbol] = future
+        return symbol_futures
+
+    @staticmethod
+    def _quarters(from_year, from_quarter, to_year, to_quarter):
+        quarters = []
+        current_year = from_year
+        current_quarter = from_quarter
+        while current_year < to_year or (current_year == to_year and current_quarter <= to_quarter):
+            quarters.append((current_year, current_quarter))
+            current_quarter += 1
+            if current_quarter % 5 == 0:
+                current_quarter = 1
+                current_year += 1
+        return quarters
+
+    def _collect_reports(self, completed, summaries, block=True):
+        # consumes symbol results in completion order, blocking for at most one result, and prints a quarter's
+        # summary once all of its symbols are done
+        while True:
+            try:
+                future, key = completed.get(block)
+            except queue.Empty:
+                return
+            summary = summaries[key]
+            try:
+                output = future.result()
+                if output:
+                    summary["succeeded"] += 1
+            except (ConnectionError, KeyError) as e:
+                summary["failed_to_get"] += 1
+            except Exception as e:
+                summary["failed_to_parse"] += 1
+            summary["pbar"].update(1)
+            summary["remaining"] -= 1
+            if summary["remaining"] == 0:
+                summary["pbar"].close()
+                print(
+                    f"For {summary['title']}\nSucceeded {summary['succeeded']}/{summary['total']}\nFailed to get {summary['failed_to_get']}/{summary['total']}\nFailed to parse {summary['failed_to_parse']}/{summary['total']}")
+            if block:
+                return
+
+    @staticmethod
+    def _new_summary(title, total):
+        return {"title": title, "total": total, "succeeded": 0, "failed_to_get": 0, "failed_to_parse": 0,
+                "remaining": total, "pbar": tqdm(total=total, leave=False, desc=title)}
+
     def get_reports(self, parser, from_year, from_quarter, to_year=datetime.today().year,
-                    to_quarter=pd.Timestamp(datetime.today()).quarter - 1, report_type="10-Q", threads=1):
+                    to_quarter=pd.Timestamp(datetime.today()).quarter - 1, report_type="10-Q", threads=1,
+                    executor="threads", processes=None, resume=False, prefetch_quarters=2):
         max_year = datetime.today().year
         max_quarter = pd.Timestamp(datetime.today()).quarter - 1
         if to_year > max_year:
@@ -96,40 +225,99 @@ class SecEdgar(object):
             to_quarter = min(max_quarter, to_quarter)
         if to_year == max_year:
             to_quarter = min(max_quarter, to_quarter)
+        run_id = self._ledger.start_run(
+            {"from_year": from_year, "from_quarter": from_quarter, "to_year": to_year, "to_quarter": to_quarter,
+             "report_type": report_type})
 
-        current_year = from_year
-        current_quarter = from_quarter
-        succeeded_count = 0
-        failed_to_get_count = 0
-        failed_to_parse = 0
+        quarters = self._quarters(from_year, from_quarter, to_year, to_quarter)
+        index_futures = {}
+        completed = queue.Queue()
+        summaries = {}
+        with ReportScheduler(parser, self._fetcher, self._ledger, run_id, executor, threads, processes,
+                             resume) as scheduler, ThreadPoolExecutor(max(1, prefetch_quarters)) as index_pool:
+            for i, (year, quarter) in enumerate(quarters):
+                # the next quarters' master.idx files download while this quarter's filings are being parsed
+                for upcoming in quarters[i:i + prefetch_quarters + 1]:
+                    if upcoming not in index_futures:
+                        index_futures[upcoming] = index_pool.submit(self.get_quarter_index, *upcoming)
+                quarter_index = index_futures.pop((year, quarter)).result()
+                summaries[(year, quarter)] = self._new_summary(f"Q{quarter} {year}", len(self._symbols))
+                symbol_futures = self._get_symbols_reports(scheduler, self._symbols, quarter_index, report_type)
+                for future in symbol_futures.values():
+                    future.add_done_callback(lambda f, key=(year, quarter): completed.put((f, key)))
+                self._collect_reports(completed, summaries, block=False)
+            while any(summary["remaining"] for summary in summaries.values()):
+                self._collect_reports(completed, summaries)
+        self._ledger.finish_run(run_id)
 
-        while current_year < to_year or (current_year == to_year and current_quarter <= to_quarter):
-            quarter_index = self.get_quarter_index(current_year, current_quarter)
-            pbar = tqdm(total=len(self._symbols), leave=False, desc=f"Q{current_quarter} {current_year}")
-            with ThreadPoolExecutor(threads) as executor:
-                futures = [executor.submit(self.get_specific_report, parser, symbol, quarter_index, report_type) for
-                           symbol in
-                           self._symbols]
-                for future in futures:
-                    try:
-                        output = future.result()
-                        if output:
-                            succeeded_count += 1
-                    except (ConnectionError, KeyError) as e:
-                        failed_to_get_count += 1
-                    except Exception as e:
-                        failed_to_parse += 1
-                    finally:
-                        pbar.update(1)
-            pbar.close()
-
-            print(
-                f"For Q{current_quarter} {current_year}\nSucceeded {succeeded_count}/{len(self._symbols)}\nFailed to get {failed_to_get_count}/{len(self._symbols)}\nFailed to parse {failed_to_parse}/{len(self._symbols)}")
+    def resume(self, parser, threads=1, executor="threads", processes=None):
+        # picks up the last recorded run over its whole date range, finished filings are skipped and only
+        # retryable failures are fetched again
+        last_run = self._ledger.last_run("from_year")
+        if last_run is None:
+            raise Exception("There is no run to resume")
+        self.get_reports(parser, threads=threads, executor=executor, processes=processes, resume=True,
+                         **last_run["arguments"])
 
-            current_quarter += 1
-            if current_quarter % 5 == 0:
-                current_quarter = 1
-                current_year += 1
+    def get_daily_index(self, day):
+        # returns None when EDGAR has no daily index for the day (weekends, holidays, not published yet), any other
+        # failure raises so the day isn't mistaken for an empty one
+        quarter = (day.month - 1) // 3 + 1
+        url = f"https://www.sec.gov/Archives/edgar/daily-index/{day.year}/QTR{quarter}/master.{day:%Y%m%d}.idx"
+        # the response always goes back to the pool, an unread streamed 404 would keep its connection checked out
+        with self._fetcher.get(url, stream=True) as response:
+            if response.status_code == 404:
+                return None
+            if response.status_code != 200:
+                raise ConnectionError(f"Couldn't get {url}, status {response.status_code}")
+            # daily indexes list the filing date as YYYYMMDD, the full index uses YYYY-MM-DD
+            return [(cik, company, form_type, f"{date_filed[:4]}-{date_filed[4:6]}-{date_filed[6:]}", filename) for
+                    cik, company, form_type, date_filed, filename in self.get_index_rows(response.iter_lines())]
+
+    def update(self, parser, report_type="10-Q", since=None, threads=1, executor="threads", processes=None):
+        # scheduled runs: reads EDGAR's daily indexes after the stored high-water mark and fetches only those filings
+        high_water_mark = self._filing_index.get_meta(DAILY_HIGH_WATER_MARK)
+        if high_water_mark is not None:
+            day = date.fromisoformat(high_water_mark) + timedelta(days=1)
+        elif since is not None:
+            day = pd.Timestamp(since).date()
+        else:
+            day = pd.Timestamp(datetime.today()).to_period("Q").start_time.date()
+        last_indexed_day = None
+        new_files = {}
+        while day <= datetime.today().date():
+            print(f"Getting daily index {day}")
+            try:
+                rows = self.get_daily_index(day)
+            except ConnectionError:
+                # the high-water mark stays before this day, the next update starts from it again
+                print(f"Failed to get the daily index of {day}, stopping here")
+                traceback.print_exc()
+                break
+            if rows is not None:
+                self._filing_index.add_filings(day.year, (day.month - 1) // 3 + 1, rows)
+                for cik, _, form_type, _, filename in rows:
+                    if form_type == report_type:
+                        new_files.setdefault(f"{cik}_{form_type}", []).append(
+                            f"https://www.sec.gov/Archives/{filename}")
+                last_indexed_day = day
+            day += timedelta(days=1)
+
+        # symbols get_cik couldn't resolve have no filings to update, like in _get_symbols_reports
+        symbols = [symbol for symbol in self._symbols if
+                   symbol in self._ciks_map and f"{self._ciks_map[symbol]}_{report_type}" in new_files]
+        run_id = self._ledger.start_run({"daily_since": high_water_mark or str(since), "report_type": report_type})
+        completed = queue.Queue()
+        summaries = {"daily": self._new_summary(f"daily indexes up to {last_indexed_day}", len(symbols))}
+        with ReportScheduler(parser, self._fetcher, self._ledger, run_id, executor, threads, processes) as scheduler:
+            for future in self._get_symbols_reports(scheduler, symbols, new_files, report_type).values():
+                future.add_done_callback(lambda f: completed.put((f, "daily")))
+            while summaries["daily"]["remaining"]:
+                self._collect_reports(completed, summaries)
+        summaries["daily"]["pbar"].close()
+        self._ledger.finish_run(run_id)
+        if last_indexed_day is not None:
+            self._filing_index.set_meta(DAILY_HIGH_WATER_MARK, last_indexed_day.isoformat())
 
 
 if __name__ == '__main__':
@@ -7,16 +7,57 @@ import numpy as np
 import bs4 as bs
 from bs4 import BeautifulSoup
 from word2number import w2n
-import dateutil.parser as dparser
+
+from sec_edgar import ParsedDocument
+from sec_edgar.raw_text import BALANCE_SHEET
+from sec_edgar.raw_text import CASH_FLOW
+from sec_edgar.raw_text import INCOME_STATEMENT
+from sec_edgar.raw_text import TITLE_PATTERNS
+from sec_edgar.line_classifier import DATE_ROW
+from sec_edgar.line_classifier import SKIPPED_KINDS
+from sec_edgar.line_classifier import classify_line
+from sec_edgar.line_classifier import clean_table_line
+from sec_edgar.line_classifier import skip_kind
+from sec_edgar.raw_text import RawLines
+from sec_edgar.table_grid import table_to_grid
+
+# row text clean up of the native html path
+_NUMBER_AFTER_WORD = re.compile(r'(?<=[a-zA-Z\)])(?=[0-9])|\s+')
+_PARENTHESIS_BEFORE_NUMBER = re.compile(r'(?<=[a-zA-Z0-9\)])\((?=[0-9])')
+_DASH_AFTER_WORD = re.compile(r'(?<=[a-zA-Z\)])—')
+_SPACE_BEFORE_CLOSING = re.compile(r'\s\)')
+_SPACE_AFTER_OPENING = re.compile(r'\(\s')
+# the raw text path's row splitting
+_VALUE_CELL = re.compile(r'[0-9]?\.?[0-9\(\)\-_—]+')
+_LETTERS = re.compile(r'[a-zA-Z]+')
+# the months _parse_raw and parse_table already put in a column name
+_PERIOD_PREFIX = re.compile(r'period: (\d+),')
+# a cell of nothing but hyphens, figure/en/em dashes or cp1252's em dash, statements print zeros that way
+_DASH_CELL = re.compile(r"^\s*[\-\u2012-\u2015\x97]+\s*$")
+# what _fix_values drops around a number: thousands separators, "$", spaces and footnote markers like "(a)", "*" or
+# "¹". a "(1)" is only a marker right after a number, on its own it's -1
+_VALUE_NOISE = re.compile(r'\s*\([a-z]\)$|(?<=[\d)])\s*\(\d\)$|[*†‡§¹²³⁰-⁹]+$|[,$\s]')
 
 
 class Parser(object):
+    # bump when a change outside the parser's own modules alters its output, invalidates cached results
+    version = 3
+    needs_xbrl = False
+    # matched against the filing's presentation roles (e.g. "CONSOLIDATEDBALANCESHEETS") to pick the statement the
+    # XBRL rows are laid out from, see Presentation.statement_concepts
+    xbrl_role = None
+
     def parse(self, content, type, do_html_native=False):
+        document = content if isinstance(content, ParsedDocument) else ParsedDocument(content, type)
         df = None
         parse_type = None
-        if type == "html":
-            soup = BeautifulSoup(content, "lxml")
-            tables, period, end_date = self._find_tables_and_info(soup)
+        if document.facts is not None and self.xbrl_role is not None:
+            df = self._parse_xbrl(document.facts)
+            if df is not None and len(df):
+                # already named "period: <months>, <month day>, <year>"
+                return df, "xbrl"
+        if document.type == "html":
+            tables, period, end_date = self._find_tables_and_info(document)
             # try:
             if do_html_native or True:
                 df, parse_type = self._parse_html_native(tables, period, end_date), "native"
@@ -26,7 +67,7 @@ class Parser(object):
             #     print("Failed to parse html, try using native html parsing")
             #     df, parse_type = self._parse_html_native(tables, period, end_date), "native"
         else:
-            df, parse_type = self._parse_raw(content), "raw"
+            df, parse_type = self._parse_raw(document.raw_lines), "raw"
         if df is not None:
             df.dropna(axis=1, how="all", inplace=True)
             self._drop_similar_columns(df)
@@ -34,20 +75,13 @@ class Parser(object):
         return df, parse_type
 
     def _find_balance_sheet_title(self, line):
-        return re.search(r"(CONSOLIDATED )?(STATEMENT )?(OF )?(FINANCIAL POSITION|BALANCE SHEETS?)", line,
-                         re.MULTILINE | re.IGNORECASE)
+        return TITLE_PATTERNS[BALANCE_SHEET].search(line)
 
     def _find_income_sheet_title(self, line):
-        return re.search(
-            r"((STATEMENT of CONSOLIDATED|CONSOLIDATED STATEMENTS?|STATEMENT)( of)?( Results)? (OF )?(EARNINGS?|OPERATIONS?|INCOME))",
-            line,
-            re.MULTILINE | re.IGNORECASE)
+        return TITLE_PATTERNS[INCOME_STATEMENT].search(line)
 
     def _find_cash_flow_title(self, line):
-        return re.search(
-            r"CONSOLIDATED STATEMENTS? (OF )?CASH FLOWS?|CONSOLIDATED STATEMENTS? (OF )?CASH|STATEMENTS? (OF )?CASH FLOWS?|CASH\sFLOWS\s\(Unaudited\)",
-            line,
-            re.MULTILINE | re.IGNORECASE)
+        return TITLE_PATTERNS[CASH_FLOW].search(line)
 
     def _find_dates(self, line):
         return re.findall(
@@ -60,8 +94,12 @@ class Parser(object):
             period = 3
             date_ = None
             year = None
+            found_period = _PERIOD_PREFIX.match(col)
             found_periods = self._find_table_beginning(col)
-            if found_periods:
+            if found_period is not None:
+                # "period: 9, ..." has no "nine months" left for _find_table_beginning to find
+                period = int(found_period.group(1))
+            elif found_periods:
                 period = found_periods[0]
             found_dates = self._find_dates(col)
             if found_dates:
@@ -75,43 +113,50 @@ class Parser(object):
             df.rename(columns=column_mapping, inplace=True)
         return df
 
-    def _is_element_before(self, e1, e2):
-        current_e = e1
-        while current_e and current_e.previous:
-            if current_e.previous == e2:
-                return True
-            current_e = current_e.previous
-        return False
+    def _is_element_before(self, document, e1, e2):
+        # whether e2 comes before e1 in the document
+        if e1 is None or e2 is None:
+            return False
+        return document.order.position(e2) < document.order.position(e1)
 
-    def _get_elements_between_tags(self, first_tag, second_tag, elements_tag, stop_after_found_tag=False):
+    def _get_elements_between_tags(self, document, first_tag, second_tag, elements_tag, stop_after_found_tag=False):
         # TODO find values scale
         period = None
         end_date = None
-        found_tags = []
-        current_tag = first_tag
-        while current_tag and current_tag.next:
-            if current_tag == second_tag:
+        if first_tag is None:
+            return [], period, end_date
+        order = document.order
+        start = order.position(first_tag)
+        # the last node of the document is never reached by a .next walk
+        stop = order.position(second_tag) if second_tag is not None else len(order) - 1
+        if stop < start:
+            stop = len(order) - 1
+        found_positions = order.named_between(elements_tag, start, stop)
+        if stop_after_found_tag:
+            found_positions = found_positions[:1]
+        # the period and end date come from the text ahead of the first found element, skipping anything that
+        # holds a table itself
+        text_stop = found_positions[0] if found_positions else stop
+        for position in range(start, text_stop):
+            if end_date and period:
                 break
-            if current_tag.name == elements_tag:
-                found_tags.append(current_tag)
-                if stop_after_found_tag:
-                    break
-            if hasattr(current_tag, 'text') and not found_tags and current_tag.find("table") is None:
-                if not end_date:
-                    found_dates = self._find_dates(current_tag.text)
-                    if found_dates:
-                        end_date = [re.sub("\s+", " ", d) for d in found_dates]
-                if not period:
-                    period = self._find_table_beginning(current_tag.text)
-            current_tag = current_tag.next
-        return found_tags, period, end_date
+            current_tag = order.nodes[position]
+            if current_tag.name is None or order.contains_named(position, "table"):
+                continue
+            if not end_date:
+                found_dates = self._find_dates(current_tag.text)
+                if found_dates:
+                    end_date = [re.sub("\s+", " ", d) for d in found_dates]
+            if not period:
+                period = self._find_table_beginning(current_tag.text)
+        return [order.nodes[position] for position in found_positions], period, end_date
 
     @abstractmethod
-    def _find_tables_and_info(self, soup):
+    def _find_tables_and_info(self, document):
         raise NotImplementedError()
 
     @abstractmethod
-    def _find_relevant_lines(self, lines):
+    def _find_relevant_lines(self, raw_lines):
         raise NotImplementedError()
 
     def _check_parent_tag(self, item, tags):
@@ -132,6 +177,8 @@ class Parser(object):
         return count
 
     def _find_multiple_words(self, tag, words=[], either=[], words_not_to_include=[], with_tag={}, exact_phrases={}):
+        # the reference title heuristic, the parsers go through the single pass sec_edgar.locator which must agree
+        # with it (see benchmarks/title_locator_benchmark.py)
         text = re.sub("\s+", " ", tag.text.strip())
         if not text or tag.name in {"html", "body"}:
             return False
@@ -185,10 +232,10 @@ class Parser(object):
 
     def _parse_raw(self, content, period=None, end_date=None, preprocess_table=True):
         if preprocess_table:
-            lines = content.replace("$", "").split("\n")
-            clean_lines = [re.sub(r"\s+", " ", line).strip() for line in lines if line]
-            start_index, end_index = self._find_relevant_lines(clean_lines)
-            table_rows = self._clean_multipage_table(clean_lines[start_index:end_index])
+            # content is the filing text or its already preprocessed RawLines
+            raw_lines = content if isinstance(content, RawLines) else RawLines(content)
+            start_index, end_index = self._find_relevant_lines(raw_lines)
+            table_rows = self._clean_multipage_table(raw_lines.lines[start_index:end_index])
         else:
             table_rows = content
         rows, num_columns, periods, years = self._lines_to_splitted_rows(table_rows, period, end_date)
@@ -197,12 +244,15 @@ class Parser(object):
                           columns=["name"] + [f"period: {period}, {year}" for period in periods for year in
                                               sorted(set(years), key=lambda x: pd.to_datetime(x), reverse=True)])
 
-        df.replace(r"^-+", "", inplace=True, regex=True)
-        df.replace(r"(\x92|\x97|\x96|_||=|\+|\*|—)+", "", inplace=True, regex=True)
+        # a value cell holding only a dash is a zero, it's turned into one before the filler clean up would blank it
+        values = df.columns[1:]
+        df[values] = df[values].replace(_DASH_CELL, "0", regex=True)
+        # one pass: leading dashes and the filler characters around the values
+        df.replace(r"^-+|(?:\x92|\x97|\x96|_||=|\+|\*|—)+", "", inplace=True, regex=True)
         df = df.replace("", np.nan).dropna(axis=0, how="all")
         df.replace(np.nan, "", inplace=True)
         for col in df.columns[1:]:
-            df[col] = df[col].apply(self._fix_values)
+            df[col] = self._fix_values(df[col])
         return df
 
     @abstractmethod
@@ -210,35 +260,7 @@ class Parser(object):
         raise NotImplementedError()
 
     def _should_skip_line(self, line):
-        if not line:
-            return True
-        if re.search(r"- ?[0-9]+ ?-", line) is not None:
-            return True
-        if re.search(r"ITEM \d+\.", line) is not None:
-            return True
-        if re.search(r"CONSOLIDATED STATEMENT OF EARNINGS.*", line) is not None:
-            return True
-        if re.search(r"\w{3,9} \d{1,2}$", line) is not None:
-            return True
-        if re.search(r"^(\d{4} ?){1,}", line) is not None:
-            return True
-        if "(Unaudited)" in line.lower():
-            return True
-        if "Months" in line:
-            return True
-        if "restated" in line.lower():
-            return True
-        if "presentation" in line.lower():
-            return True
-        if "see accompanying" in line.lower():
-            return True
-        if line.isupper() and ":" not in line:
-            return True
-        if line == "<PAGE>" or (line.startswith("(") and line.endswith(")")):
-            return True
-        if line.lower().startswith("*"):
-            return True
-        return False
+        return skip_kind(line) is not None
 
     def _lines_to_splitted_rows(self, table_rows, periods, end_date):
         num_columns = 0
@@ -281,41 +303,34 @@ class Parser(object):
                     content_beginning = True
                 continue
             if num_columns:
-                line = re.sub(r"(-|\.){3,}", "",
-                              line.replace("_", "").replace("=", "").replace(",", "").replace("*", "")).strip()
-                if self._should_skip_line(line):
+                line = clean_table_line(line)
+                kind = classify_line(line)
+                if kind in SKIPPED_KINDS:
                     continue
-                try:
-                    if re.search("[0-9]?\.[0-9]*", line) is None and re.search(
-                            r".*\s+[0-9.\(\)\-_]+\s+[0-9.\(\)\-_$]+", line, re.IGNORECASE) is None:
-                        dparser.parse(line, fuzzy=True)
+                if kind == DATE_ROW:
+                    splits = [line]
+                elif line.endswith(":"):
+                    splits = [line]
+                elif "(" in line and ")" not in line:
+                    splits = [line]
+                elif line in ["realizable value", "Assets", "Liabilities and Stockholders' Equity"]:
+                    splits = [f"{line}:"]
+                elif "DISCONTINUED OPERATIONS" in line:
+                    splits = [f"{line}:"]
+                elif line.startswith("Average number of common") or line.endswith("(millions)") or line.startswith(
+                        "Adjustments to reconcile"):
+                    splits = [f"{line}"]
+                else:
+                    splits = line.rsplit(maxsplit=num_columns)
+                    # r'[0-9.\(\)\-_—]+'
+                    if sum([_VALUE_CELL.search(p) is not None for p in splits][1:]) == num_columns:
+                        pass
+                    # if re.search(rf".+\s+[0-9.\(\)\-_—]+\s+[0-9.\(\)\-_—$]+", line, re.IGNORECASE):
+                    #     splits = line.rsplit(maxsplit=num_columns)
+                    elif _LETTERS.search(line) is not None:
                         splits = [line]
                     else:
-                        raise
-                except:
-                    if line.endswith(":"):
-                        splits = [line]
-                    elif "(" in line and ")" not in line:
-                        splits = [line]
-                    elif line in ["realizable value", "Assets", "Liabilities and Stockholders' Equity"]:
-                        splits = [f"{line}:"]
-                    elif "DISCONTINUED OPERATIONS" in line:
-                        splits = [f"{line}:"]
-                    elif line.startswith("Average number of common") or line.endswith("(millions)") or line.startswith(
-                            "Adjustments to reconcile"):
-                        splits = [f"{line}"]
-                    else:
-                        splits = line.rsplit(maxsplit=num_columns)
-                        # r'[0-9.\(\)\-_—]+'
-                        if sum([re.search(r'[0-9]?\.?[0-9\(\)\-_—]+', p) is not None for p in splits][
-                               1:]) == num_columns:
-                            pass
-                        # if re.search(rf".+\s+[0-9.\(\)\-_—]+\s+[0-9.\(\)\-_—$]+", line, re.IGNORECASE):
-                        #     splits = line.rsplit(maxsplit=num_columns)
-                        elif re.search(r"[a-zA-Z]+", line) is not None:
-                            splits = [line]
-                        else:
-                            continue
+                        continue
                 if "<S>" not in line and splits:
                     if sum([done_sequence in splits[0].lower() for done_sequence in done_before_sequences]) == 0:
                         rows.append(splits)
@@ -363,9 +378,13 @@ class Parser(object):
             complete_rows.append(combined_rows)
         return complete_rows
 
-    @abstractmethod
-    def _parse_xbrl(self, soup):
-        raise NotImplementedError()
+    def _parse_xbrl(self, facts):
+        # without the filing's own layout there's no telling which facts make the statement, the html and raw
+        # parsing run instead
+        if facts.presentation is None:
+            return None
+        concepts = facts.presentation.statement_concepts(self.xbrl_role)
+        return facts.statement(concepts) if concepts else None
 
     @abstractmethod
     def _parse_html(self, soup, period=None, end_date=None):
@@ -377,33 +396,39 @@ class Parser(object):
             tables = [tables]
         dfs = []
         for table in tables:
+            # one pass over the table's own rows, each cell's visible text once and hidden rows and cells dropped
+            grid, _ = table_to_grid(table, repeat_spans=False, skip_invisible_rows=True)
             lines = []
-            rows = table.find_all("tr")
-            for row in rows:
-                line = re.sub(r'\u200b', ' ', row.text)
-                line = line.replace("(", " (")
-                line = re.sub(r'(?<=[a-zA-Z\)])(?=[0-9])|\s+', ' ',
-                              line.replace("\n", " ").replace("$", " ")).strip()
-                line = re.sub(r'(?<=[a-zA-Z0-9\)])\((?=[0-9])', " (", line)
-                line = re.sub(r'(?<=[a-zA-Z\)])—', " —", line)
-                line = re.sub(r'\s\)', ')', line)
-                line = re.sub(r'\(\s', '(', line)
-                line = line.replace("Thre e", "Three")
-                if line and re.search('visibility\s*:\s*hidden', row.attrs.get("style", ""), re.IGNORECASE) is None:
+            for cells in grid:
+                line = self._row_to_line(" ".join(cell for cell in cells if cell))
+                if line:
                     lines.append(line)
             if len(lines) > 10:
                 df = self._parse_raw(lines, period, end_date, preprocess_table=False)
                 dfs.append(df)
         return pd.concat(dfs)
 
-    def _fix_values(self, x):
-        if not x:
-            return x
-        x = x.replace("\x97", "0").replace(",", "")
-        x = x.strip("$")
-        if x.startswith("(") or x.endswith(")"):
-            x = "-" + x.strip("()")
-        return float(x) if "." in x else int(x)
+    def _row_to_line(self, text):
+        line = text.replace("\u200b", " ").replace("(", " (").replace("\n", " ").replace("$", " ")
+        line = _NUMBER_AFTER_WORD.sub(" ", line).strip()
+        line = _PARENTHESIS_BEFORE_NUMBER.sub(" (", line)
+        line = _DASH_AFTER_WORD.sub(" —", line)
+        line = _SPACE_BEFORE_CLOSING.sub(")", line)
+        line = _SPACE_AFTER_OPENING.sub("(", line)
+        return line.replace("Thre e", "Three")
+
+    def _fix_values(self, column):
+        # a whole column of cell strings to numbers: "(1,234)" is -1234, a lone dash is 0, "$" and trailing footnote
+        # markers are dropped and empty cells are missing. Int64 when no cell has a fraction, float64 otherwise
+        text = column.fillna("").astype(str).str.replace(_VALUE_NOISE, "", regex=True)
+        text = text.str.replace(_DASH_CELL, "0", regex=True)
+        negative = text.str.startswith("(") | text.str.endswith(")")
+        text = text.str.strip("()")
+        numbers = pd.to_numeric(text.where(text != ""))
+        numbers = numbers.where(~negative, -numbers)
+        if text.str.contains(".", regex=False).any():
+            return numbers.astype("float64")
+        return numbers.astype("Int64")
 
     def _clean_the_table(self, df):
         df.replace("\u200b", np.nan, inplace=True)
@@ -507,12 +532,32 @@ class Parser(object):
             df.reset_index(drop=True, inplace=True)
         return df
 
-    def parse_table(self, table_html, period=None, end_date=None):
-        df = pd.read_html(table_html)
-        if isinstance(df, list):
-            df = df[0]
-        if df.columns.nlevels > 1:
+    def _grid_to_frame(self, grid, header_rows):
+        # the frame read_html would give for the table: cells stay strings, empty ones are NaN, and the header rows
+        # holding any text name the columns
+        header = [row for row in grid[:header_rows] if any(row)]
+        if len(header) > 1:
             raise Exception("Can't parse multilevel table that way")
+        body = [[cell if cell else np.nan for cell in row] for row in grid[header_rows:]]
+        if not header:
+            return pd.DataFrame(body, columns=range(len(grid[0])) if grid else None)
+        columns = []
+        seen = {}
+        for i, name in enumerate(header[0]):
+            name = name or f"Unnamed: {i}"
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
+            else:
+                seen[name] = 0
+            columns.append(name)
+        return pd.DataFrame(body, columns=columns)
+
+    def parse_table(self, table, period=None, end_date=None):
+        # `table` is a located <table> element, or a (grid, header_rows) pair from table_to_grid, the element is
+        # turned into cell strings directly instead of going through str() and pd.read_html
+        grid, header_rows = table_to_grid(table) if isinstance(table, bs.Tag) else table
+        df = self._grid_to_frame(grid, header_rows)
         df = self._clean_the_table(df)
         df = self._combine_first_rows(df)
         df = self._combine_columns(df)
@@ -524,7 +569,7 @@ class Parser(object):
         df = df[1:]
         # period = self._find_periods(df)
         for col in df.columns[1:]:
-            df[col] = df[col].apply(self._fix_values)
+            df[col] = self._fix_values(df[col])
         if end_date:
             column_mapping = {}
             for col in df.columns[1:]:
@@ -0,0 +1,139 @@
+import multiprocessing
+import random
+import threading
+import time
+import uuid
+import weakref
+
+THROTTLED_STATUSES = {429, 503}
+
+_shared_limiter = None
+# every limiter this process holds by key, a pickled Fetcher carries only its limiter's key
+_limiters = weakref.WeakValueDictionary()
+# the limiters a worker process got from its pool initializer, nothing else references them there
+_worker_limiters = ()
+
+
+class RateLimiter(object):
+    def __init__(self, rate=10, min_rate=0.5, ramp=0.1, concurrency=8, max_retries=5, backoff=1.0, max_backoff=60):
+        # the token bucket lives in shared memory so forked/spawned workers draw from the same budget,
+        # the concurrency cap is per process
+        self.max_rate = rate
+        self.min_rate = min_rate
+        self.ramp = ramp
+        self.max_concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._lock = multiprocessing.Lock()
+        self._rate = multiprocessing.RawValue("d", rate)
+        self._tokens = multiprocessing.RawValue("d", rate)
+        self._updated = multiprocessing.RawValue("d", time.monotonic())
+        self._blocked_until = multiprocessing.RawValue("d", 0)
+        self.key = uuid.uuid4().hex
+        self._init_local()
+
+    def _init_local(self):
+        _limiters[self.key] = self
+        self._condition = threading.Condition()
+        self._concurrency = self.max_concurrency
+        self._active = 0
+        self._successes = 0
+
+    def __getstate__(self):
+        # only reached while starting worker processes, the shared values travel with them
+        state = self.__dict__.copy()
+        for key in ("_condition", "_concurrency", "_active", "_successes"):
+            del state[key]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_local()
+
+    @classmethod
+    def shared(cls):
+        global _shared_limiter
+        if _shared_limiter is None:
+            _shared_limiter = cls()
+        return _shared_limiter
+
+    @classmethod
+    def set_shared(cls, limiter, *limiters):
+        # used as a process pool initializer so every worker uses the parent's limiter, `limiters` are the custom
+        # ones the fetchers sent to the workers hold
+        global _shared_limiter, _worker_limiters
+        _shared_limiter = limiter
+        _worker_limiters = (limiter,) + limiters
+        for worker_limiter in _worker_limiters:
+            _limiters[worker_limiter.key] = worker_limiter
+
+    @classmethod
+    def registered(cls, key):
+        limiter = _limiters.get(key)
+        if limiter is None:
+            raise RuntimeError(f"RateLimiter {key} was never handed to this process, pass it to the process pool "
+                               f"initializer RateLimiter.set_shared")
+        return limiter
+
+    @property
+    def rate(self):
+        return self._rate.value
+
+    @property
+    def concurrency(self):
+        return self._concurrency
+
+    def _take_token(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                rate = self._rate.value
+                self._tokens.value = min(rate, self._tokens.value + (now - self._updated.value) * rate)
+                self._updated.value = now
+                wait = self._blocked_until.value - now
+                if wait <= 0:
+                    if self._tokens.value >= 1:
+                        self._tokens.value -= 1
+                        return
+                    wait = (1 - self._tokens.value) / rate
+            time.sleep(wait)
+
+    def __enter__(self):
+        with self._condition:
+            while self._active >= self._concurrency:
+                self._condition.wait()
+            self._active += 1
+        try:
+            self._take_token()
+        except BaseException:
+            self.__exit__(None, None, None)
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        with self._condition:
+            self._active -= 1
+            self._condition.notify()
+
+    def throttled(self, attempt):
+        # multiplicative decrease with a jittered exponential pause shared by every process
+        delay = min(self.max_backoff, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.5)
+        with self._lock:
+            self._rate.value = max(self.min_rate, self._rate.value / 2)
+            self._tokens.value = 0
+            self._blocked_until.value = max(self._blocked_until.value, time.monotonic() + delay)
+        with self._condition:
+            self._concurrency = max(1, self._concurrency // 2)
+            self._successes = 0
+
+    def succeeded(self):
+        # additive increase back towards the configured rate and concurrency
+        with self._lock:
+            self._rate.value = min(self.max_rate, self._rate.value + self.ramp)
+        with self._condition:
+            self._successes += 1
+            if self._concurrency < self.max_concurrency and self._successes >= self._concurrency:
+                self._concurrency += 1
+                self._successes = 0
+                self._condition.notify()
@@ -0,0 +1,63 @@
+import re
+from bisect import bisect_left
+
+BALANCE_SHEET = "balance_sheet"
+INCOME_STATEMENT = "income_statement"
+CASH_FLOW = "cash_flow"
+
+TITLE_PATTERNS = {
+    BALANCE_SHEET: re.compile(r"(CONSOLIDATED )?(STATEMENT )?(OF )?(FINANCIAL POSITION|BALANCE SHEETS?)",
+                              re.MULTILINE | re.IGNORECASE),
+    INCOME_STATEMENT: re.compile(
+        r"((STATEMENT of CONSOLIDATED|CONSOLIDATED STATEMENTS?|STATEMENT)( of)?( Results)? (OF )?(EARNINGS?|OPERATIONS?|INCOME))",
+        re.MULTILINE | re.IGNORECASE),
+    CASH_FLOW: re.compile(
+        r"CONSOLIDATED STATEMENTS? (OF )?CASH FLOWS?|CONSOLIDATED STATEMENTS? (OF )?CASH|STATEMENTS? (OF )?CASH FLOWS?|CASH\sFLOWS\s\(Unaudited\)",
+        re.MULTILINE | re.IGNORECASE),
+}
+# every title above contains one of these, the precise patterns only run on the few lines that pass
+_TITLE_PREFILTER = re.compile(r"STATEMENT|FINANCIAL POSITION|BALANCE SHEET|CASH\sFLOWS", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+class RawLines(object):
+    # the raw text path's preprocessing, done once per filing and shared by every statement parser: normalized lines,
+    # the lines outside the table of contents, and where each statement title appears among them
+    def __init__(self, content):
+        self.lines = [_WHITESPACE.sub(" ", line).strip() for line in content.replace("$", "").split("\n") if line]
+        self.searchable = []
+        self.titles = {kind: [] for kind in TITLE_PATTERNS}
+        in_page = False
+        in_index = False
+        there_were_pages = False
+        for i, line in enumerate(self.lines):
+            lower_line = line.lower()
+            if in_index and "<page>" in lower_line:
+                in_index = False
+                continue
+            if "<page>" in lower_line:
+                in_page = True
+                there_were_pages = True
+                continue
+            if lower_line == "index" and in_page:
+                in_index = True
+                continue
+            if not in_index and (in_page or not there_were_pages):
+                self.searchable.append(i)
+                if _TITLE_PREFILTER.search(line) is not None:
+                    for kind, pattern in TITLE_PATTERNS.items():
+                        if pattern.search(line) is not None:
+                            self.titles[kind].append(i)
+
+    def first_title(self, kinds, start=0):
+        # the first searchable line at or after `start` holding any of the `kinds` of titles, -1 when there is none
+        found = -1
+        for kind in kinds:
+            positions = self.titles[kind]
+            i = bisect_left(positions, start)
+            if i < len(positions) and (found == -1 or positions[i] < found):
+                found = positions[i]
+        return found
+
+    def searchable_from(self, start):
+        return self.searchable[bisect_left(self.searchable, start):]
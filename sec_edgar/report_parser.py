@@ -1,23 +1,52 @@
 import os
-import requests
 import re
 from datetime import datetime
 import traceback
 
 import warnings
 
+from bs4 import BeautifulSoup
+import pandas as pd
+
 warnings.filterwarnings("ignore")
 
+from sec_edgar import Fetcher
+from sec_edgar import FilingCache
+from sec_edgar import ResultCache
 from sec_edgar import Parser
+from sec_edgar import ParsedDocument
+from sec_edgar import Statement
+from sec_edgar.sgml import Submission
+from sec_edgar.sgml import SubmissionDocument
+from sec_edgar.sgml import read_submission
+from sec_edgar.sgml import XBRL_LABELS
+from sec_edgar.sgml import XBRL_PRESENTATION
+from sec_edgar.xbrl import Presentation
+from sec_edgar.xbrl import is_inline_xbrl
+from sec_edgar.xbrl import read_inline_xbrl
+from sec_edgar.xbrl import read_labels
+from sec_edgar.xbrl import read_presentation
+from sec_edgar.xbrl import read_xbrl
 from sec_edgar import BalanceSheetParser
 from sec_edgar import CashFlowParser
 from sec_edgar import GeneralParser
 from sec_edgar import IncomeStatementParser
 
+FETCH_MODES = {"submission", "primary"}
+
 
 class ReportParser(Parser):
-    def __init__(self, output_folder=os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")):
+    def __init__(self, output_folder=os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"), fetcher=None,
+                 fetch_mode="submission", cache_max_bytes=None, cache_results=True, compact_statements=False):
+        if fetch_mode not in FETCH_MODES:
+            raise ValueError(f"fetch_mode must be one of {sorted(FETCH_MODES)}, got {fetch_mode}")
         self.base_folder = output_folder
+        self.cache = FilingCache(output_folder, cache_max_bytes)
+        self.result_cache = ResultCache(os.path.join(output_folder, "results")) if cache_results else None
+        self.fetcher = fetcher or Fetcher()
+        self.fetch_mode = fetch_mode
+        # return statements as compact Statement objects instead of DataFrames, the result cache keeps the frames
+        self.compact_statements = compact_statements
         self.parsers = []
 
     def add_parser(self, parser):
@@ -28,33 +57,108 @@ class ReportParser(Parser):
         html_end = re.search(rf"</{tag}>", content, re.IGNORECASE | re.MULTILINE).end()
         return content[html_start:html_end]
 
-    def _get_xbrl_content(self, content):
-        xbrl_start = content.find("<XBRL>")
-        if xbrl_start == -1:
-            xbrl_start = content.find("<xbrl>")
-        xbrl_end = content.find("</XBRL>")
-        if xbrl_end == -1:
-            xbrl_end = content.find("</xbrl>")
-        xbrl_end += len("</xbrl>")
-        return content[xbrl_start:xbrl_end]
-
-    def _get_content(self, file_url, save=True):
-        local_path = os.path.join(self.base_folder, file_url.split('/')[-1])
-        if os.path.exists(local_path):
-            with open(local_path, "r", encoding="utf8") as f:
-                content = f.read()
-        else:
-            response = requests.get(file_url, headers={'accept-encoding': 'gzip'})
-            if response.status_code == 200:
-                content = response.content.decode("utf8")
-                if save:
-                    if os.path.exists(local_path):
-                        raise Exception("The file already exists")
-                    with open(local_path, "w", encoding="utf8") as f:
-                        f.write(content)
-            else:
-                raise ConnectionError(f"Couldn't get {file_url}")
-        return content
+    def _get_facts(self, submission, file_url):
+        # tagged facts give the statements exactly, the html and raw heuristics only run when there are none. an
+        # inline XBRL primary document is already in memory so it's preferred over a separate instance
+        primary_text = submission.primary_document.text
+        xbrl_document = submission.xbrl_document
+        try:
+            facts = read_inline_xbrl(primary_text) if is_inline_xbrl(primary_text) else None
+            if (facts is None or not len(facts)) and xbrl_document is not None:
+                facts = read_xbrl(xbrl_document.text)
+            presentation_document = submission.xbrl_linkbase(XBRL_PRESENTATION)
+            if facts is not None and presentation_document is not None:
+                label_document = submission.xbrl_linkbase(XBRL_LABELS)
+                facts.presentation = Presentation(read_presentation(presentation_document.text),
+                                                  read_labels(label_document.text) if label_document else None)
+        except Exception:
+            print(f"Failed to read the XBRL facts of {file_url}")
+            traceback.print_exc()
+            return None
+        return facts if facts is not None and len(facts) else None
+
+    def _iter_content_lines(self, file_url, save=True):
+        key = self.cache.key(file_url)
+        stream = self.cache.open(key)
+        if stream is None and not save:
+            # lines keep their "\n" like the cached file's do, callers join them back into documents
+            with self._get_response(file_url) as response:
+                for line in response.iter_lines(decode_unicode=True):
+                    yield f"{line}\n"
+            return
+        if stream is None:
+            with self.cache.single_flight(key):
+                stream = self.cache.open(key)
+                if stream is None:
+                    with self._get_response(file_url) as response, self.cache.writer(key) as f:
+                        for chunk in response.iter_content(chunk_size=2 ** 16, decode_unicode=True):
+                            f.write(chunk)
+                    stream = self.cache.open(key)
+        with stream:
+            yield from stream
+
+    def _get_response(self, file_url):
+        response = self.fetcher.get(file_url, stream=True)
+        if response.status_code != 200:
+            # a streamed response keeps its pooled connection until closed, and the pool blocks once it runs dry
+            response.close()
+            raise ConnectionError(f"Couldn't get {file_url}")
+        response.encoding = "utf8"
+        return response
+
+    def _needs_xbrl(self):
+        return any(parser.needs_xbrl for parser in self.parsers)
+
+    def _get_submission(self, file_url, save=True):
+        if self.fetch_mode == "primary":
+            submission = self._get_primary_submission(file_url, save)
+            if submission is not None:
+                return submission
+        return read_submission(self._iter_content_lines(file_url, save), self._needs_xbrl())
+
+    def _get_filing_index(self, file_url, save=True):
+        # edgar/data/<cik>/<accession>.txt -> edgar/data/<cik>/<accession without dashes>/<accession>-index.htm
+        base_url, accession = file_url[:-len(".txt")].rsplit("/", 1)
+        index_url = f"{base_url}/{accession.replace('-', '')}/{accession}-index.htm"
+        try:
+            content = "".join(self._iter_content_lines(index_url, save))
+        except ConnectionError:
+            return None, []
+        soup = BeautifulSoup(content, "lxml")
+        period = None
+        for info_head in soup.find_all("div", class_="infoHead"):
+            if info_head.text.strip() == "Period of Report":
+                period = info_head.find_next_sibling("div", class_="info").text.strip().replace("-", "")
+        documents = []
+        for table in soup.find_all("table", class_="tableFile"):
+            for row in table.find_all("tr"):
+                cells = row.find_all("td")
+                link = cells[2].find("a") if len(cells) > 3 else None
+                if link is not None and link.get("href"):
+                    href = link["href"].replace("/ix?doc=", "")
+                    documents.append((cells[3].text.strip(), f"https://www.sec.gov{href}"))
+        return period, documents
+
+    def _get_primary_submission(self, file_url, save=True):
+        # downloads only the primary document (and the XBRL instance and linkbases if a parser needs them) instead of
+        # every exhibit, returns None for filings without an index so the caller falls back to the full submission
+        period, index_documents = self._get_filing_index(file_url, save)
+        if not index_documents or not index_documents[0][0] or period is None:
+            # old filings only list the complete submission text file, which has no document type
+            return None
+        documents = []
+        needs_xbrl = self._needs_xbrl()
+        inline = False
+        for i, (document_type, document_url) in enumerate(index_documents):
+            document = SubmissionDocument(document_type, filename=document_url.split("/")[-1])
+            if i == 0 or (needs_xbrl and document.is_xbrl and not (inline and document.is_xbrl_instance)):
+                lines = self._iter_content_lines(document_url, save)
+                document.text = "".join(lines)
+                documents.append(document)
+                if i == 0:
+                    # an inline primary document carries the facts so the instance isn't needed, the linkbases still are
+                    inline = is_inline_xbrl(document.text)
+        return Submission("", documents, period)
 
     def _get_report_content(self, content):
         content_type = "html"
@@ -92,17 +196,48 @@ class ReportParser(Parser):
             report_content = content
         return report_content, content_type
 
+    def _get_cached_tables(self, file_url):
+        # returns the tables already parsed by the current version of each parser and the parsers still to run
+        if self.result_cache is None:
+            return {}, self.parsers
+        accession = self.result_cache.accession(file_url)
+        all_tables = {}
+        missing_parsers = []
+        for parser in self.parsers:
+            found, output = self.result_cache.get(accession, parser)
+            if not found:
+                missing_parsers.append(parser)
+            elif output is not None:
+                all_tables[parser.__class__.__name__] = self._to_output(output)
+        return all_tables, missing_parsers
+
+    def _to_output(self, output):
+        if self.compact_statements and isinstance(output, pd.DataFrame):
+            return Statement.from_frame(output)
+        return output
+
+    def _prepare(self, file_url, save=True):
+        all_tables, missing_parsers = self._get_cached_tables(file_url)
+        submission = self._get_submission(file_url, save) if missing_parsers else None
+        return all_tables, missing_parsers, submission
+
     def parse(self, file_url, save=True):
         print(f"Parsing {file_url}")
-        content = self._get_content(file_url, save)
-        report_content, content_type = self._get_report_content(content)
-        report_date = datetime.strptime(
-            re.findall(r"CONFORMED PERIOD OF REPORT:[\s\t]+(\d+)", content)[0], "%Y%m%d")
+        all_tables, missing_parsers, submission = self._prepare(file_url, save)
+        if missing_parsers:
+            all_tables.update(self.parse_submission(submission, file_url, missing_parsers))
+        return all_tables
+
+    def parse_submission(self, submission, file_url, parsers=None):
+        report_content, content_type = self._get_report_content(submission.primary_document.text)
+        report_date = datetime.strptime(submission.period_of_report, "%Y%m%d")
+        document = ParsedDocument(report_content, content_type, self._get_facts(submission, file_url))
         parsing_type = None
         all_tables = {}
-        for parser in self.parsers:
+        for parser in self.parsers if parsers is None else parsers:
+            output = None
             try:
-                output, parsing_type = parser.parse(report_content, content_type, parsing_type == "native")
+                output, parsing_type = parser.parse(document, content_type, parsing_type == "native")
                 # TODO validate the first column in 'name' and all the rest have some date in it
                 if len(output) == 0:
                     raise Exception()
@@ -110,9 +245,13 @@ class ReportParser(Parser):
                     print(f"columns: {len(output.columns)}, rows: {len(output)}\n{output.columns.tolist()}")
                 all_tables[parser.__class__.__name__] = output
             except:
+                output = None
                 print(f"Failed to parse {file_url} using {parser.__class__.__name__}")
                 traceback.print_exc()
-        return all_tables
+            if self.result_cache is not None:
+                self.result_cache.set(self.result_cache.accession(file_url), parser, output)
+        # converted only once every frame is cached
+        return {name: self._to_output(output) for name, output in all_tables.items()}
 
     pass
 
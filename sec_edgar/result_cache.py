@@ -0,0 +1,107 @@
+import ast
+import glob
+import gzip
+import hashlib
+import importlib
+import inspect
+import os
+import pickle
+import sys
+import tempfile
+
+_fingerprints = {}
+# the modules building what the parsers get, the parsers never import them
+_INPUT_MODULES = ("sec_edgar.sgml", "sec_edgar.xbrl")
+
+
+def _imported_modules(module):
+    # the sec_edgar modules `module` imports, names taken from the package resolve to the module defining them
+    imported = set()
+    for node in ast.walk(ast.parse(inspect.getsource(module))):
+        if isinstance(node, ast.ImportFrom) and node.module == "sec_edgar":
+            package = importlib.import_module("sec_edgar")
+            for alias in node.names:
+                value = getattr(package, alias.name)
+                imported.add(value.__name__ if inspect.ismodule(value) else value.__module__)
+        elif isinstance(node, ast.ImportFrom) and (node.module or "").startswith("sec_edgar."):
+            imported.add(node.module)
+        elif isinstance(node, ast.Import):
+            imported.update(alias.name for alias in node.names if alias.name.startswith("sec_edgar."))
+    return imported
+
+
+def parser_modules(parser_class):
+    # every sec_edgar module a parser's behaviour depends on, its classes' modules and what they import transitively
+    pending = [cls.__module__ for cls in parser_class.__mro__ if cls is not object] + list(_INPUT_MODULES)
+    modules = {}
+    while pending:
+        name = pending.pop()
+        if name in modules:
+            continue
+        module = sys.modules.get(name) or importlib.import_module(name)
+        modules[name] = module
+        try:
+            pending.extend(_imported_modules(module))
+        except (OSError, TypeError):
+            pass
+    return [modules[name] for name in sorted(modules)]
+
+
+def parser_fingerprint(parser):
+    # the explicit `version` covers behaviour living outside sec_edgar, the source hash catches the rest
+    parser_class = type(parser)
+    if parser_class not in _fingerprints:
+        digest = hashlib.sha1(str(getattr(parser, "version", 0)).encode("utf8"))
+        for module in parser_modules(parser_class):
+            try:
+                digest.update(inspect.getsource(module).encode("utf8"))
+            except (OSError, TypeError):
+                digest.update(module.__name__.encode("utf8"))
+        _fingerprints[parser_class] = digest.hexdigest()[:16]
+    return _fingerprints[parser_class]
+
+
+class ResultCache(object):
+    def __init__(self, folder):
+        self.folder = folder
+
+    @staticmethod
+    def accession(file_url):
+        return file_url.split("/")[-1].rsplit(".", 1)[0]
+
+    def _folder(self, accession):
+        filer_id, year, _ = accession.split("-")
+        return os.path.join(self.folder, filer_id, year, accession)
+
+    def _path(self, accession, parser):
+        return os.path.join(self._folder(accession), f"{type(parser).__name__}-{parser_fingerprint(parser)}.pkl.gz")
+
+    def get(self, accession, parser):
+        # returns (found, result), a stored None means the parser already failed on this filing with the same
+        # fingerprint
+        try:
+            with gzip.open(self._path(accession, parser), "rb") as f:
+                return True, pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return False, None
+
+    def set(self, accession, parser, result):
+        path = self._path(accession, parser)
+        folder = os.path.dirname(path)
+        os.makedirs(folder, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        # results of older versions of this parser are stale from now on
+        for stale_path in glob.glob(os.path.join(folder, f"{type(parser).__name__}-*.pkl.gz")):
+            if stale_path != path:
+                try:
+                    os.remove(stale_path)
+                except FileNotFoundError:
+                    pass
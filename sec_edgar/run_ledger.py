@@ -0,0 +1,85 @@
+import json
+import sqlite3
+import threading
+import time
+
+SUCCEEDED = "succeeded"
+FAILED_TO_GET = "failed_to_get"
+FAILED_TO_PARSE = "failed_to_parse"
+# the whole filing failed before any statement parser ran, e.g. no period of report in the header
+FAILED = "failed"
+
+RETRYABLE_STATUSES = {FAILED_TO_GET}
+
+
+class RunLedger(object):
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS runs (run_id INTEGER PRIMARY KEY AUTOINCREMENT, arguments TEXT, "
+            "started REAL, finished REAL)")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS tasks (accession TEXT, parser TEXT, cik TEXT, status TEXT, error TEXT, "
+            "attempts INTEGER, run_id INTEGER, updated REAL, PRIMARY KEY (accession, parser))")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS tasks_cik ON tasks (cik)")
+        self._connection.commit()
+
+    @staticmethod
+    def filing_keys(file_url):
+        # .../edgar/data/<cik>/<accession>.txt
+        cik, file_name = file_url.split("/")[-2:]
+        return cik, file_name.rsplit(".", 1)[0]
+
+    def start_run(self, arguments):
+        with self._lock:
+            cursor = self._connection.execute("INSERT INTO runs (arguments, started) VALUES (?, ?)",
+                                              (json.dumps(arguments), time.time()))
+            self._connection.commit()
+            return cursor.lastrowid
+
+    def finish_run(self, run_id):
+        with self._lock:
+            self._connection.execute("UPDATE runs SET finished = ? WHERE run_id = ?", (time.time(), run_id))
+            self._connection.commit()
+
+    def last_run(self, kind=None):
+        # kind, when given, is an argument name only that kind of run records, e.g. "from_year" for backfills
+        with self._lock:
+            rows = self._connection.execute("SELECT run_id, arguments, finished FROM runs ORDER BY run_id DESC")
+            for run_id, arguments, finished in rows:
+                arguments = json.loads(arguments)
+                if kind is None or kind in arguments:
+                    return {"run_id": run_id, "arguments": arguments, "finished": finished}
+        return None
+
+    def record(self, run_id, file_url, statuses, error=None):
+        # statuses maps parser name to status for a single filing
+        cik, accession = self.filing_keys(file_url)
+        now = time.time()
+        with self._lock:
+            for parser_name, status in statuses.items():
+                self._connection.execute(
+                    "INSERT INTO tasks VALUES (?, ?, ?, ?, ?, 1, ?, ?) ON CONFLICT (accession, parser) DO UPDATE SET "
+                    "status = excluded.status, error = excluded.error, attempts = attempts + 1, "
+                    "run_id = excluded.run_id, updated = excluded.updated",
+                    (accession, parser_name, cik, status, error, run_id, now))
+            self._connection.commit()
+
+    def statuses(self, file_url):
+        _, accession = self.filing_keys(file_url)
+        with self._lock:
+            rows = self._connection.execute("SELECT parser, status, error FROM tasks WHERE accession = ?",
+                                            (accession,)).fetchall()
+        return {parser_name: (status, error) for parser_name, status, error in rows}
+
+    def completed(self, file_url, parser_names):
+        # returns the recorded statuses when every parser reached a final status, otherwise None
+        statuses = self.statuses(file_url)
+        for parser_name in parser_names:
+            if parser_name not in statuses or statuses[parser_name][0] in RETRYABLE_STATUSES:
+                return None
+        return statuses
@@ -0,0 +1,164 @@
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+
+from sec_edgar import RateLimiter
+from sec_edgar.run_ledger import FAILED
+from sec_edgar.run_ledger import FAILED_TO_GET
+from sec_edgar.run_ledger import FAILED_TO_PARSE
+from sec_edgar.run_ledger import SUCCEEDED
+
+EXECUTORS = {"threads", "processes", "hybrid"}
+
+_DONE = object()
+
+
+class ReportScheduler(object):
+    def __init__(self, parser, fetcher, ledger, run_id, executor="threads", threads=1, processes=None, resume=False):
+        # one set of workers for the whole run, filings from every quarter share them
+        if executor not in EXECUTORS:
+            raise ValueError(f"executor must be one of {sorted(EXECUTORS)}, got {executor}")
+        processes = processes or os.cpu_count()
+        self._parser = parser
+        self._parser_names = [p.__class__.__name__ for p in parser.parsers]
+        self._fetcher = fetcher
+        self._ledger = ledger
+        self._run_id = run_id
+        self._executor = executor
+        self._threads = threads
+        self._max_queued = 2 * processes
+        self._resume = resume
+        self._futures = {}
+        self._futures_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(threads) if executor == "threads" else None
+        # a limiter's lock only reaches the workers through the initializer, so they get the shared one and the
+        # ones of the fetchers sent to them
+        limiters = [getattr(f, "rate_limiter", None) for f in (fetcher, getattr(parser, "fetcher", None))]
+        limiters = [limiter for limiter in limiters if limiter is not None]
+        self._process_pool = ProcessPoolExecutor(processes, initializer=RateLimiter.set_shared,
+                                                 initargs=(RateLimiter.shared(), *limiters)
+                                                 ) if executor != "threads" else None
+        self._pipeline = None
+        self._queue_closed = False
+        if executor == "hybrid":
+            self._queue = queue.Queue()
+            self._pipeline = threading.Thread(target=self._download_and_parse_files, daemon=True)
+            self._pipeline.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        if self._pipeline is not None:
+            self._queue.put(_DONE)
+            self._pipeline.join()
+        for pool in (self._pool, self._process_pool):
+            if pool is not None:
+                pool.shutdown()
+
+    def submit(self, file_url):
+        # single-flight per accession, a filing listed under several CIKs (co-registrants) or reached through
+        # several tickers of one company is fetched and parsed once and every caller gets the same future
+        _, accession = self._ledger.filing_keys(file_url)
+        with self._futures_lock:
+            if accession in self._futures:
+                return self._futures[accession]
+        statuses = self._ledger.completed(file_url, self._parser_names) if self._resume else None
+        if statuses is not None:
+            future = self._completed_report(statuses)
+        elif self._executor == "hybrid":
+            future = Future()
+            self._queue.put((file_url, future))
+        else:
+            # in the process mode only the parser and the file url are sent to the workers
+            future = (self._pool or self._process_pool).submit(self._parser.parse, file_url, True)
+        if statuses is None:
+            future.add_done_callback(lambda f: self._record(file_url, f))
+        # only in-flight filings are kept, a finished one's result belongs to the callers already holding its future
+        with self._futures_lock:
+            self._futures[accession] = future
+        future.add_done_callback(lambda f: self._forget(accession, f))
+        return future
+
+    def _forget(self, accession, future):
+        with self._futures_lock:
+            if self._futures.get(accession) is future:
+                del self._futures[accession]
+
+    @staticmethod
+    def _completed_report(statuses):
+        # stands in for a filing the ledger already finished, nothing is re-fetched or re-parsed
+        future = Future()
+        errors = [error for status, error in statuses.values() if status == FAILED]
+        if errors:
+            future.set_exception(Exception(errors[0]))
+        else:
+            future.set_result({name: None for name, (status, _) in statuses.items() if status == SUCCEEDED})
+        return future
+
+    def _record(self, file_url, future):
+        error = future.exception()
+        if error is None:
+            tables = future.result()
+            statuses = {name: SUCCEEDED if name in tables else FAILED_TO_PARSE for name in self._parser_names}
+        elif isinstance(error, ConnectionError):
+            statuses = {name: FAILED_TO_GET for name in self._parser_names}
+        else:
+            statuses = {name: FAILED for name in self._parser_names}
+        self._ledger.record(self._run_id, file_url, statuses, None if error is None else repr(error))
+
+    @staticmethod
+    def _set_parsed(future, parse_future, cached_tables):
+        if parse_future.exception() is not None:
+            future.set_exception(parse_future.exception())
+        else:
+            future.set_result(dict(cached_tables, **parse_future.result()))
+
+    def _download_and_parse_files(self):
+        futures = {}
+        try:
+            self._pipeline_files(futures)
+        except Exception as e:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+            # filings still queued, and any submitted later, fail with the same error until close
+            if not self._queue_closed:
+                for _, future in iter(self._queue.get, _DONE):
+                    future.set_exception(e)
+
+    def _pipeline_files(self, futures):
+        # downloads run on `threads` fetch workers and feed the process pool through a bounded queue,
+        # the semaphore keeps the number of downloaded but unparsed filings bounded as well
+        def file_urls():
+            for file_url, future in iter(self._queue.get, _DONE):
+                futures[file_url] = future
+                yield file_url
+            self._queue_closed = True
+
+        parser = self._parser
+        in_flight = threading.Semaphore(self._max_queued)
+        fetched = self._fetcher.iter_fetch(file_urls(), lambda file_url: parser._prepare(file_url, save=True),
+                                           self._threads, self._max_queued)
+        for file_url, prepared, error in fetched:
+            future = futures.pop(file_url)
+            if error is not None:
+                future.set_exception(error)
+                continue
+            cached_tables, missing_parsers, submission = prepared
+            if not missing_parsers:
+                # every result is cached, nothing to send to the process pool
+                future.set_result(cached_tables)
+                continue
+            print(f"Parsing {file_url}")
+            in_flight.acquire()
+            parse_future = self._process_pool.submit(parser.parse_submission, submission, file_url, missing_parsers)
+            parse_future.add_done_callback(lambda f: in_flight.release())
+            parse_future.add_done_callback(
+                lambda f, future=future, cached_tables=cached_tables: self._set_parsed(future, f, cached_tables))
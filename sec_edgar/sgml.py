@@ -0,0 +1,107 @@
+import re
+
+XBRL_INSTANCE_TYPES = {"EX-101.INS"}
+# type and filename suffix of the linkbases the statements are laid out from
+XBRL_PRESENTATION = ("EX-101.PRE", "_pre.xml")
+XBRL_LABELS = ("EX-101.LAB", "_lab.xml")
+
+_METADATA_TAGS = {"<TYPE>": "type", "<SEQUENCE>": "sequence", "<FILENAME>": "filename",
+                  "<DESCRIPTION>": "description"}
+
+
+class SubmissionDocument(object):
+    def __init__(self, type=None, sequence=None, filename=None, description=None, text=None):
+        self.type = type
+        self.sequence = sequence
+        self.filename = filename
+        self.description = description
+        self.text = text
+
+    @property
+    def is_xbrl_instance(self):
+        return self.type in XBRL_INSTANCE_TYPES or (self.filename or "").lower().endswith("_htm.xml")
+
+    def is_xbrl_linkbase(self, kind):
+        document_type, suffix = kind
+        return self.type == document_type or (self.filename or "").lower().endswith(suffix)
+
+    @property
+    def is_xbrl(self):
+        return (self.is_xbrl_instance or self.is_xbrl_linkbase(XBRL_PRESENTATION) or
+                self.is_xbrl_linkbase(XBRL_LABELS))
+
+
+class Submission(object):
+    def __init__(self, header, documents, period_of_report=None):
+        self.header = header
+        self.documents = documents
+        self._period_of_report = period_of_report
+
+    @property
+    def period_of_report(self):
+        if self._period_of_report is not None:
+            return self._period_of_report
+        found = re.search(r"CONFORMED PERIOD OF REPORT:[\s\t]+(\d+)", self.header)
+        return found.group(1) if found else None
+
+    @property
+    def primary_document(self):
+        return self.documents[0] if self.documents else None
+
+    @property
+    def xbrl_document(self):
+        for document in self.documents[1:]:
+            if document.is_xbrl_instance:
+                return document
+        return None
+
+    def xbrl_linkbase(self, kind):
+        for document in self.documents[1:]:
+            if document.is_xbrl_linkbase(kind):
+                return document
+        return None
+
+
+def read_submission(lines, with_xbrl=False):
+    # walks the <DOCUMENT> structure line by line and keeps only the primary document (always the first one)
+    # and, when asked, the XBRL instance and linkbases, every other document is skipped without being materialized
+    header = []
+    documents = []
+    document = None
+    text = None
+    in_text = False
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if in_text:
+            if line.startswith("</TEXT>"):
+                in_text = False
+                if text is not None:
+                    document.text = "\n".join(text)
+                    text = None
+            elif text is not None:
+                text.append(line)
+            continue
+        if line.startswith("<DOCUMENT>"):
+            document = SubmissionDocument()
+            continue
+        if document is None:
+            header.append(line)
+            continue
+        if line.startswith("<TEXT>"):
+            in_text = True
+            if not documents or (with_xbrl and document.is_xbrl):
+                text = []
+            continue
+        if line.startswith("</DOCUMENT>"):
+            if document.text is not None:
+                documents.append(document)
+            document = None
+            continue
+        for tag, attribute in _METADATA_TAGS.items():
+            if line.startswith(tag):
+                setattr(document, attribute, line[len(tag):].strip())
+                break
+    if not documents:
+        # not an SGML submission, keep everything we read as a single document
+        documents.append(SubmissionDocument(text="\n".join(header)))
+    return Submission("\n".join(header), documents)
@@ -0,0 +1,117 @@
+import re
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# a statement column, "period: 3, march 31, 2020" is (3, 2020-03-31)
+COLUMN_KEY = np.dtype([("period_months", np.int16), ("end_date", "datetime64[D]")])
+# the column names Parser._normalize_column_name and XbrlFacts.statement give
+_COLUMN_NAME = re.compile(r"period: (\d+), ([a-z]+)\.? (\d{1,2}), (\d{4})$", re.IGNORECASE)
+_PERIOD = re.compile(r"period: (\d+),")
+
+
+def parse_column_name(name):
+    found = _COLUMN_NAME.match(str(name))
+    if found is not None:
+        period, month, day, year = found.groups()
+        try:
+            # the first three letters cover full names and abbreviations like "Sept."
+            end_date = datetime.strptime(f"{month[:3]} {day} {year}", "%b %d %Y").date()
+            return int(period), np.datetime64(end_date, "D")
+        except ValueError:
+            pass
+    found = _PERIOD.match(str(name))
+    if found is None:
+        raise ValueError(f"Unexpected statement column {name}")
+    return int(found.group(1)), np.datetime64("NaT", "D")
+
+
+def column_name(period_months, end_date):
+    if np.isnat(end_date):
+        return f"period: {period_months}, None, None"
+    end_date = pd.Timestamp(end_date)
+    return f"period: {period_months}, {end_date.strftime('%B').lower()} {end_date.day}, {end_date.year}"
+
+
+class Statement(object):
+    # one parsed statement without the per cell objects of a DataFrame: the line item labels as interned strings,
+    # structured (period_months, end_date) column keys and every value in one contiguous float64 array
+    __slots__ = ("labels", "columns", "values")
+
+    def __init__(self, labels, columns, values):
+        self.labels = tuple(sys.intern(str(label)) for label in labels)
+        self.columns = np.asarray(columns, dtype=COLUMN_KEY)
+        self.values = np.ascontiguousarray(values, dtype=np.float64).reshape(len(self.labels), len(self.columns))
+
+    @classmethod
+    def from_frame(cls, df):
+        # the frames Parser.parse returns, a "name" column followed by the value columns. columns are taken by
+        # position, two of them may share a name
+        positions = [i for i, col in enumerate(df.columns) if col != "name"]
+        labels = df["name"].tolist() if "name" in df.columns else [""] * len(df)
+        values = np.empty((len(df), len(positions)), dtype=np.float64)
+        for j, i in enumerate(positions):
+            values[:, j] = pd.to_numeric(df.iloc[:, i], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+        return cls(labels, [parse_column_name(df.columns[i]) for i in positions], values)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getstate__(self):
+        return self.labels, self.columns, self.values
+
+    def __setstate__(self, state):
+        # interning doesn't survive pickling, labels coming back from a worker process are interned again
+        labels, self.columns, self.values = state
+        self.labels = tuple(sys.intern(label) for label in labels)
+
+    def to_frame(self):
+        df = pd.DataFrame(self.values, columns=[column_name(*key) for key in self.columns.tolist()])
+        df.insert(0, "name", list(self.labels))
+        return df
+
+
+class StatementPanel(object):
+    # statements of many filings kept as chunks, each one still referencing its own arrays. adding a statement copies
+    # nothing, the long frame is built once by to_frame
+    def __init__(self, statements=(), keys=None):
+        self.statements = []
+        self.keys = []
+        for i, statement in enumerate(statements):
+            self.append(statement, i if keys is None else keys[i])
+
+    def append(self, statement, key=None):
+        self.statements.append(statement)
+        self.keys.append(len(self.keys) if key is None else key)
+
+    def __len__(self):
+        return sum(len(statement) * len(statement.columns) for statement in self.statements)
+
+    def to_frame(self):
+        # one row per value: key, name, period_months, end_date and value, with key and name categorical
+        label_codes = {}
+        key_codes = {}
+        codes = []
+        keys = []
+        columns = []
+        values = []
+        for key, statement in zip(self.keys, self.statements):
+            width = len(statement.columns)
+            statement_codes = np.fromiter((label_codes.setdefault(label, len(label_codes)) for label in
+                                           statement.labels), dtype=np.int32, count=len(statement))
+            codes.append(np.repeat(statement_codes, width))
+            keys.append(np.full(len(statement) * width, key_codes.setdefault(key, len(key_codes)), dtype=np.int32))
+            columns.append(np.tile(statement.columns, len(statement)))
+            values.append(statement.values.ravel())
+        columns = np.concatenate(columns) if columns else np.empty(0, dtype=COLUMN_KEY)
+        return pd.DataFrame({
+            "key": pd.Categorical.from_codes(np.concatenate(keys) if keys else np.empty(0, dtype=np.int32),
+                                             list(key_codes)),
+            "name": pd.Categorical.from_codes(np.concatenate(codes) if codes else np.empty(0, dtype=np.int32),
+                                              list(label_codes)),
+            "period_months": columns["period_months"],
+            "end_date": columns["end_date"],
+            "value": np.concatenate(values) if values else np.empty(0, dtype=np.float64),
+        })
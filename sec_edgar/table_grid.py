@@ -0,0 +1,114 @@
+import re
+
+from bs4 import CData
+from bs4 import NavigableString
+from bs4 import Tag
+
+# the cell text clean up pandas.read_html applies
+_WHITESPACE = re.compile(r"[\r\n]+|\s{2,}")
+_HIDDEN = re.compile(r"display\s*:\s*none", re.IGNORECASE)
+_INVISIBLE = re.compile(r"visibility\s*:\s*hidden", re.IGNORECASE)
+_SPAN = re.compile(r"\d+")
+_TEXT_TYPES = (NavigableString, CData)
+
+
+def _is_hidden(tag):
+    # read_html drops every element styled display:none
+    return _HIDDEN.search(tag.attrs.get("style", "")) is not None
+
+
+def _visible_text(tag):
+    strings = []
+    stack = [iter(tag.children)]
+    while stack:
+        child = next(stack[-1], None)
+        if child is None:
+            stack.pop()
+        elif isinstance(child, Tag):
+            if not _is_hidden(child):
+                stack.append(iter(child.children))
+        elif type(child) in _TEXT_TYPES:
+            strings.append(child)
+    return "".join(strings)
+
+
+def _span(tag, name):
+    found = _SPAN.search(tag.attrs.get(name, "") or "")
+    return max(1, int(found.group())) if found else 1
+
+
+def _table_rows(table, skip_invisible_rows=False):
+    # (section, tr) for the rows of this table only, rows of nested tables belong to those tables
+    rows = []
+    stack = [(iter(table.children), "tbody")]
+    while stack:
+        child = next(stack[-1][0], None)
+        if child is None:
+            stack.pop()
+            continue
+        if not isinstance(child, Tag) or child.name == "table" or _is_hidden(child):
+            continue
+        section = child.name if child.name in {"thead", "tbody", "tfoot"} else stack[-1][1]
+        if child.name == "tr":
+            if not skip_invisible_rows or _INVISIBLE.search(child.attrs.get("style", "")) is None:
+                rows.append((section, child))
+        else:
+            stack.append((iter(child.children), section))
+    return rows
+
+
+def _expand_spans(rows, repeat_spans=True):
+    # colspan repeats a cell to the right, rowspan carries it down to the same column of the next rows, the same
+    # layout read_html builds. without repeat_spans the covered cells are left empty
+    grid = []
+    remainder = []
+    for row in rows:
+        texts = []
+        next_remainder = []
+        index = 0
+        for cell in row.find_all(["td", "th"], recursive=False):
+            if _is_hidden(cell):
+                continue
+            while remainder and remainder[0][0] <= index:
+                previous_index, text, rowspan = remainder.pop(0)
+                texts.append(text)
+                if rowspan > 1:
+                    next_remainder.append((previous_index, text, rowspan - 1))
+                index += 1
+            text = _WHITESPACE.sub(" ", _visible_text(cell).strip())
+            rowspan = _span(cell, "rowspan")
+            covered = text if repeat_spans else ""
+            for i in range(_span(cell, "colspan")):
+                texts.append(text if i == 0 else covered)
+                if rowspan > 1:
+                    next_remainder.append((index, covered, rowspan - 1))
+                index += 1
+        for previous_index, text, rowspan in remainder:
+            texts.append(text)
+            if rowspan > 1:
+                next_remainder.append((previous_index, text, rowspan - 1))
+        grid.append(texts)
+        remainder = next_remainder
+    while remainder:
+        grid.append([text for _, text, _ in remainder])
+        remainder = [(index, text, rowspan - 1) for index, text, rowspan in remainder if rowspan > 1]
+    return grid
+
+
+def table_to_grid(table, repeat_spans=True, skip_invisible_rows=False):
+    # returns (rows, header_rows): every row of cell strings, padded to the same width, with the header rows first.
+    # header rows are the <thead> rows or, without one, the leading rows made of <th> cells only. the native html
+    # path reads each cell once (repeat_spans=False) and drops visibility:hidden rows as well
+    rows = _table_rows(table, skip_invisible_rows)
+    head = [row for section, row in rows if section == "thead"]
+    body = [row for section, row in rows if section == "tbody"]
+    foot = [row for section, row in rows if section == "tfoot"]
+    if not head:
+        while body and all(cell.name == "th" for cell in body[0].find_all(["td", "th"], recursive=False)):
+            head.append(body.pop(0))
+    header = _expand_spans(head, repeat_spans)
+    grid = header + _expand_spans(body, repeat_spans) + _expand_spans(foot, repeat_spans)
+    width = max((len(row) for row in grid), default=0)
+    for row in grid:
+        row.extend([""] * (width - len(row)))
+    return grid, len(header)
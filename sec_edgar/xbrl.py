@@ -0,0 +1,350 @@
+import io
+import re
+from array import array
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from lxml import etree
+
+XBRLI_NS = "http://www.xbrl.org/2003/instance"
+_CONTEXT = f"{{{XBRLI_NS}}}context"
+_START_DATE = f"{{{XBRLI_NS}}}startDate"
+_END_DATE = f"{{{XBRLI_NS}}}endDate"
+_INSTANT = f"{{{XBRLI_NS}}}instant"
+_SEGMENT = f"{{{XBRLI_NS}}}segment"
+_SCENARIO = f"{{{XBRLI_NS}}}scenario"
+_NIL = "{http://www.w3.org/2001/XMLSchema-instance}nil"
+# facts live in the taxonomy namespaces, everything in these is structure
+_STRUCTURE_NAMESPACES = {XBRLI_NS, "http://www.xbrl.org/2003/linkbase", "http://www.w3.org/1999/xlink"}
+
+_XBRL_WRAPPER = re.compile(r"^\s*<XBRL>\s*|\s*</XBRL>\s*$", re.IGNORECASE)
+
+IX_NAMESPACES = {"http://www.xbrl.org/2013/inlineXBRL", "http://www.xbrl.org/2008/inlineXBRL"}
+_NON_FRACTION = {f"{{{ns}}}nonFraction" for ns in IX_NAMESPACES}
+_NON_NUMERIC = {f"{{{ns}}}nonNumeric" for ns in IX_NAMESPACES}
+# block level xhtml elements are dropped once they end, an ix:nonFraction never spans one
+_BLOCKS = {f"{{http://www.w3.org/1999/xhtml}}{tag}" for tag in ("p", "div", "tr")}
+_INLINE_MARKER = re.compile(r"http://www\.xbrl\.org/20(?:08|13)/inlineXBRL")
+_NOT_A_NUMBER = re.compile(r"[^0-9.,]")
+
+LINK_NS = "http://www.xbrl.org/2003/linkbase"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+_PRESENTATION_LINK = f"{{{LINK_NS}}}presentationLink"
+_PRESENTATION_ARC = f"{{{LINK_NS}}}presentationArc"
+_LABEL_LINK = f"{{{LINK_NS}}}labelLink"
+_LABEL_ARC = f"{{{LINK_NS}}}labelArc"
+_LABEL = f"{{{LINK_NS}}}label"
+_LOC = f"{{{LINK_NS}}}loc"
+_XLINK_LABEL = f"{{{XLINK_NS}}}label"
+_XLINK_HREF = f"{{{XLINK_NS}}}href"
+_XLINK_ROLE = f"{{{XLINK_NS}}}role"
+_XLINK_FROM = f"{{{XLINK_NS}}}from"
+_XLINK_TO = f"{{{XLINK_NS}}}to"
+STANDARD_LABEL = "http://www.xbrl.org/2003/role/label"
+# roles of notes, their details and the parenthetical pages share words with the statements they belong to
+_NOT_A_STATEMENT = re.compile(r"PARENTHETICAL|DETAIL|TABLES|POLICIES|NARRATIVE")
+_NOT_A_WORD = re.compile(r"[^0-9A-Za-z]")
+
+
+class XbrlFacts(object):
+    # contexts and numeric facts in flat typed arrays, concepts and context ids are interned to integer indexes so a
+    # filing's few thousand facts take a few tens of kilobytes
+    def __init__(self):
+        self.concepts = []
+        self._concept_ids = {}
+        self._context_ids = {}
+        # per context, dates as proleptic ordinals, start is 0 for instants
+        self.context_start = array("q")
+        self.context_end = array("q")
+        self.context_dimensional = array("b")
+        self.fact_concept = array("i")
+        self.fact_context = array("i")
+        self.fact_value = array("d")
+        self.texts = {}
+        # the filing's Presentation, when its linkbases were read
+        self.presentation = None
+
+    def __len__(self):
+        return len(self.fact_value)
+
+    def _concept_id(self, concept):
+        concept_id = self._concept_ids.get(concept)
+        if concept_id is None:
+            concept_id = self._concept_ids[concept] = len(self.concepts)
+            self.concepts.append(concept)
+        return concept_id
+
+    def _context_id(self, context_ref):
+        # facts may come before their context, the slot is created on first reference and filled by add_context
+        context_id = self._context_ids.get(context_ref)
+        if context_id is None:
+            context_id = self._context_ids[context_ref] = len(self.context_end)
+            self.context_start.append(0)
+            self.context_end.append(0)
+            self.context_dimensional.append(1)
+        return context_id
+
+    def add_context(self, context_ref, start, end, dimensional):
+        context_id = self._context_id(context_ref)
+        self.context_start[context_id] = start.toordinal() if start is not None else 0
+        self.context_end[context_id] = end.toordinal() if end is not None else 0
+        self.context_dimensional[context_id] = dimensional
+
+    def add_fact(self, concept, context_ref, value):
+        self.fact_concept.append(self._concept_id(concept))
+        self.fact_context.append(self._context_id(context_ref))
+        self.fact_value.append(value)
+
+    def add_text(self, concept, context_ref, text):
+        # only the first value of a non numeric concept is kept, it's enough for cover page facts
+        self.texts.setdefault(concept, text)
+
+    def value(self, concept):
+        # the first numeric fact of `concept`, preferring facts without dimensions, None when it wasn't reported
+        concept_id = self._concept_ids.get(concept)
+        if concept_id is None:
+            return None
+        fallback = None
+        for i in range(len(self.fact_concept)):
+            if self.fact_concept[i] == concept_id:
+                if not self.context_dimensional[self.fact_context[i]]:
+                    return self.fact_value[i]
+                if fallback is None:
+                    fallback = self.fact_value[i]
+        return fallback
+
+    def statement(self, concepts):
+        # concepts are (concept, label) pairs in row order, see Presentation.statement_concepts, a concept listed
+        # twice keeps its first row. columns follow Parser._normalize_column_name: "period: <months>, <month day>,
+        # <year>"
+        labels = []
+        lookup = np.full(len(self.concepts), -1, dtype=np.int64)
+        for concept, label in concepts:
+            concept_id = self._concept_ids.get(concept)
+            if concept_id is not None and lookup[concept_id] == -1:
+                lookup[concept_id] = len(labels)
+                labels.append(label)
+        if not len(self.fact_value) or not labels:
+            return None
+
+        fact_concept = np.frombuffer(self.fact_concept, dtype=np.int32)
+        fact_context = np.frombuffer(self.fact_context, dtype=np.int32)
+        fact_value = np.frombuffer(self.fact_value, dtype=np.float64)
+        context_start = np.frombuffer(self.context_start, dtype=np.int64)
+        context_end = np.frombuffer(self.context_end, dtype=np.int64)
+        context_dimensional = np.frombuffer(self.context_dimensional, dtype=np.int8)
+        rows = lookup[fact_concept]
+        mask = (rows >= 0) & (context_dimensional[fact_context] == 0) & (context_end[fact_context] > 0)
+        if not mask.any():
+            return None
+        rows = rows[mask]
+        contexts = fact_context[mask]
+        values = fact_value[mask]
+
+        # duplicated contexts (same dates, different ids) collapse into one column
+        starts = context_start[contexts]
+        ends = context_end[contexts]
+        months = np.where(starts > 0, np.rint((ends - starts + 1) / 30.44), 3).astype(np.int64)
+        keys, columns = np.unique(np.stack([months, -ends], axis=1), axis=0, return_inverse=True)
+        columns = columns.reshape(-1)
+        grid = np.full((len(labels), len(keys)), np.nan)
+        grid[rows, columns] = values
+
+        # a statement's own columns are filled for most rows, a context carrying a couple of facts (e.g. an opening
+        # balance in the equity statement) is not one of them
+        filled = (~np.isnan(grid)).sum(axis=0)
+        keep_columns = filled * 2 >= filled.max()
+        keep_rows = ~np.isnan(grid[:, keep_columns]).all(axis=1)
+        grid = grid[keep_rows][:, keep_columns]
+        names = []
+        for period, negative_end in keys[keep_columns]:
+            end = date.fromordinal(int(-negative_end))
+            names.append(f"period: {period}, {end:%B} {end.day}, {end.year}".lower())
+        df = pd.DataFrame(grid, columns=names)
+        df.insert(0, "name", [label for label, keep in zip(labels, keep_rows) if keep])
+        return df
+
+
+class Presentation(object):
+    # how the filing itself lays its statements out: per role of its presentation linkbase the concepts in order,
+    # named by its label linkbase
+    def __init__(self, roles, labels=None):
+        # role -> [(concept, preferred label role)], (concept, label role) -> text
+        self.roles = roles
+        self.labels = labels or {}
+
+    def label(self, concept, preferred=None):
+        # without a label linkbase the concept's own name is the most faithful label there is
+        return (self.labels.get((concept, preferred)) or self.labels.get((concept, STANDARD_LABEL)) or
+                concept.partition(":")[2])
+
+    def statement_concepts(self, role_pattern):
+        # the (concept, label) rows of the first role whose name matches `role_pattern`, None when there is none.
+        # role names are the last part of the role URI, upper cased without punctuation
+        for role, rows in self.roles.items():
+            name = _NOT_A_WORD.sub("", (role or "").rpartition("/")[2]).upper()
+            if _NOT_A_STATEMENT.search(name) is None and role_pattern.search(name) is not None:
+                return [(concept, self.label(concept, preferred)) for concept, preferred in rows]
+        return None
+
+
+def _parse_date(text):
+    return date.fromisoformat(text.strip()[:10]) if text and text.strip() else None
+
+
+def _add_context(facts, element):
+    start = end = None
+    for child in element.iter(_START_DATE, _END_DATE, _INSTANT):
+        if child.tag == _START_DATE:
+            start = _parse_date(child.text)
+        else:
+            end = _parse_date(child.text)
+    dimensional = any(len(child) for child in element.iter(_SEGMENT, _SCENARIO))
+    facts.add_context(element.get("id"), start, end, dimensional)
+
+
+def _xml_source(text):
+    # instances and inline documents carried inside an SGML submission are wrapped in <XBRL> tags
+    if isinstance(text, str):
+        text = _XBRL_WRAPPER.sub("", text).strip().encode("utf8")
+    return io.BytesIO(text)
+
+
+def read_xbrl(text):
+    # a single iterparse pass over an XBRL instance, each top level element is handled when it ends and then
+    # dropped so the tree never holds more than one fact or context
+    facts = XbrlFacts()
+    depth = 0
+    for event, element in etree.iterparse(_xml_source(text), events=("start", "end"), huge_tree=True,
+                                          recover=True):
+        if event == "start":
+            depth += 1
+            continue
+        depth -= 1
+        if depth != 1:
+            continue
+        if element.tag == _CONTEXT:
+            _add_context(facts, element)
+        elif isinstance(element.tag, str) and element.get("contextRef") is not None:
+            namespace, _, local_name = element.tag[1:].partition("}")
+            if namespace not in _STRUCTURE_NAMESPACES and element.get(_NIL) != "true":
+                concept = f"{element.prefix}:{local_name}"
+                text = (element.text or "").strip()
+                if element.get("unitRef") is not None:
+                    try:
+                        facts.add_fact(concept, element.get("contextRef"), float(text))
+                    except ValueError:
+                        pass
+                else:
+                    facts.add_text(concept, element.get("contextRef"), text)
+        element.clear()
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+    return facts
+
+
+def is_inline_xbrl(text):
+    return _INLINE_MARKER.search(text) is not None
+
+
+def _inline_value(element):
+    # applies the transformation named by `format`, then `scale` and `sign`
+    text = "".join(element.itertext()).strip()
+    format = (element.get("format") or "").rpartition(":")[2].lower()
+    if "zero" in format:
+        # ixt:zerodash, ixt:fixed-zero
+        value = 0.0
+    elif "words" in format:
+        if text.lower() not in {"no", "none", "nil", "zero"}:
+            raise ValueError(f"Unsupported number in words {text}")
+        value = 0.0
+    else:
+        text = _NOT_A_NUMBER.sub("", text)
+        if "comma" in format:
+            # ixt:numcommadecimal, ixt:num-comma-decimal
+            text = text.replace(".", "").replace(",", ".")
+        else:
+            text = text.replace(",", "")
+        value = float(text)
+    value *= 10 ** int(element.get("scale") or 0)
+    return -value if element.get("sign") == "-" else value
+
+
+def read_inline_xbrl(text):
+    # one iterparse pass over an inline XBRL document, contexts come from ix:resources and facts from the
+    # ix:nonFraction tags spread through the html, block elements are cleared as soon as they end
+    facts = XbrlFacts()
+    for _, element in etree.iterparse(_xml_source(text), events=("end",), huge_tree=True, recover=True):
+        tag = element.tag
+        if tag == _CONTEXT:
+            _add_context(facts, element)
+            element.clear(keep_tail=True)
+        elif tag in _NON_FRACTION:
+            if element.get(_NIL) != "true":
+                try:
+                    facts.add_fact(element.get("name"), element.get("contextRef"), _inline_value(element))
+                except ValueError:
+                    pass
+        elif tag in _NON_NUMERIC:
+            if element.get("name", "").startswith("dei:"):
+                facts.add_text(element.get("name"), element.get("contextRef"), "".join(element.itertext()).strip())
+        elif tag in _BLOCKS:
+            element.clear(keep_tail=True)
+    return facts
+
+
+def _href_concept(href):
+    # "us-gaap-2020-01-31.xsd#us-gaap_Assets" -> "us-gaap:Assets"
+    prefix, _, name = href.rpartition("#")[2].partition("_")
+    return f"{prefix}:{name}"
+
+
+def _locators(link):
+    return {loc.get(_XLINK_LABEL): _href_concept(loc.get(_XLINK_HREF, "")) for loc in link.iter(_LOC)}
+
+
+def read_presentation(text):
+    # role -> [(concept, preferred label role)] walking each role's parent-child arcs depth first, siblings in their
+    # arcs' order
+    roles = {}
+    for _, link in etree.iterparse(_xml_source(text), events=("end",), tag=_PRESENTATION_LINK, huge_tree=True,
+                                   recover=True):
+        locators = _locators(link)
+        children = {}
+        targets = set()
+        for arc in link.iter(_PRESENTATION_ARC):
+            children.setdefault(arc.get(_XLINK_FROM), []).append(
+                (float(arc.get("order") or 0), arc.get(_XLINK_TO), arc.get("preferredLabel")))
+            targets.add(arc.get(_XLINK_TO))
+        rows = roles.setdefault(link.get(_XLINK_ROLE), [])
+        stack = [(label, None) for label in reversed(list(locators)) if label in children and label not in targets]
+        seen = set()
+        while stack:
+            label, preferred = stack.pop()
+            if label in seen or label not in locators:
+                continue
+            seen.add(label)
+            rows.append((locators[label], preferred))
+            for _, child, child_preferred in sorted(children.get(label, ()), key=lambda arc: arc[0], reverse=True):
+                stack.append((child, child_preferred))
+        link.clear()
+    return roles
+
+
+def read_labels(text):
+    # (concept, label role) -> text, the first label of a role wins
+    labels = {}
+    for _, link in etree.iterparse(_xml_source(text), events=("end",), tag=_LABEL_LINK, huge_tree=True,
+                                   recover=True):
+        locators = _locators(link)
+        resources = {}
+        for label in link.iter(_LABEL):
+            resources.setdefault(label.get(_XLINK_LABEL), []).append(
+                (label.get(_XLINK_ROLE) or STANDARD_LABEL, "".join(label.itertext()).strip()))
+        for arc in link.iter(_LABEL_ARC):
+            concept = locators.get(arc.get(_XLINK_FROM))
+            for role, label_text in resources.get(arc.get(_XLINK_TO), ()):
+                labels.setdefault((concept, role), label_text)
+        link.clear()
+    return labels
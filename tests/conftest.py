@@ -0,0 +1,69 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from sec_edgar import Fetcher
+from sec_edgar import RateLimiter
+
+USER_AGENT = "sec_edgar tests test@example.com"
+TICKERS = {"0": {"cik_str": 320193, "ticker": "AAPL", "title": "Apple Inc."}}
+
+
+def run_with_timeout(target, timeout=10):
+    # False when `target` is still running after `timeout` seconds, e.g. blocked on a pool that ran dry
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return not thread.is_alive()
+
+
+class EdgarServer(object):
+    # a local stand-in for www.sec.gov, `routes` maps a path to (status, body, headers), anything else is a 404
+    def __init__(self):
+        self.routes = {"/files/company_tickers.json": (200, json.dumps(TICKERS).encode("utf8"), {})}
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.requests.append((self.path, dict(self.headers)))
+                status, body, headers = server.routes.get(self.path, (404, b"Not Found", {}))
+                etag = headers.get("ETag")
+                if etag is not None and self.headers.get("If-None-Match") == etag:
+                    status, body = 304, b""
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def edgar_server():
+    server = EdgarServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def fetcher(edgar_server):
+    return Fetcher(edgar_server.url, connections=2, timeout=5, user_agent=USER_AGENT,
+                   rate_limiter=RateLimiter(rate=1000, max_retries=0))
@@ -0,0 +1,76 @@
+import contextlib
+import io
+import os
+
+from sec_edgar import BalanceSheetParser
+from sec_edgar import CashFlowParser
+from sec_edgar import IncomeStatementParser
+from sec_edgar import ParsedDocument
+from sec_edgar.document import strip_unused_markup
+from sec_edgar.locator import TITLE_SPECS
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+PARSERS = [IncomeStatementParser(), BalanceSheetParser(), CashFlowParser()]
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), "r", encoding="utf8") as f:
+        return f.read()
+
+
+def attempt(function, *args):
+    # the result, or the error `function` failed with
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return function(*args)
+    except Exception as e:
+        return repr(e)
+
+
+def outputs(document):
+    # each parser's tables with their period and end date, and its statement
+    results = {}
+    for parser in PARSERS:
+        found = attempt(parser._find_tables_and_info, document)
+        if not isinstance(found, str):
+            tables, period, end_date = found
+            found = [str(table) for table in tables], period, end_date
+        results[parser.__class__.__name__] = found, attempt(parser.parse, document, "html")
+    return results
+
+
+def same(first, second):
+    if isinstance(first, str) or isinstance(second, str):
+        return first == second
+    (first_df, first_type), (second_df, second_type) = first, second
+    if first_df is None or second_df is None:
+        return first_df is second_df and first_type == second_type
+    return first_df.equals(second_df) and first_type == second_type
+
+
+def test_strip_unused_markup():
+    content = strip_unused_markup(read_fixture("statements.htm"))
+    for unused in ("<head", "<script", "<style", "<ix:header", "<!--", "commented out"):
+        assert unused not in content
+    assert "CONDENSED CONSOLIDATED BALANCE SHEETS (Unaudited)" in content
+
+
+def test_selective_document_parses_the_same():
+    content = read_fixture("statements.htm")
+    full = ParsedDocument(content, "html", selective=False)
+    selective = ParsedDocument(content, "html", selective=True)
+    assert len(selective.order) < len(full.order)
+    for name in TITLE_SPECS:
+        full_title, selective_title = full.titles[name], selective.titles[name]
+        assert (full_title is None) == (selective_title is None), name
+        if full_title is not None:
+            assert str(full_title) == str(selective_title), name
+    full_outputs = outputs(full)
+    selective_outputs = outputs(selective)
+    for name, (tables, statement) in full_outputs.items():
+        assert selective_outputs[name][0] == tables, name
+        assert same(selective_outputs[name][1], statement), name
+    # the balance sheet's only table is found through the titles either way
+    tables, _, _ = full_outputs["BalanceSheetParser"][0]
+    assert len(tables) == 1
+    assert "Total shareholders' equity" in tables[0]
@@ -0,0 +1,46 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from sec_edgar import Fetcher
+from sec_edgar import RateLimiter
+from sec_edgar.fetcher import USER_AGENT_ENV
+
+
+def test_user_agent_needs_a_contact_email(monkeypatch):
+    monkeypatch.delenv(USER_AGENT_ENV, raising=False)
+    with pytest.raises(ValueError):
+        Fetcher()
+    with pytest.raises(ValueError):
+        Fetcher(user_agent="sec_edgar (https://github.com/ofrik/sec_edgar)")
+    monkeypatch.setenv(USER_AGENT_ENV, "Sample Company admin@example.com")
+    assert Fetcher().user_agent == "Sample Company admin@example.com"
+
+
+def test_forbidden_fails_without_throttling(edgar_server):
+    edgar_server.routes["/forbidden"] = (403, b"Forbidden", {})
+    limiter = RateLimiter(rate=100, concurrency=4, max_retries=5)
+    fetcher = Fetcher(edgar_server.url, user_agent="sec_edgar tests test@example.com", rate_limiter=limiter)
+    with pytest.raises(PermissionError):
+        fetcher.get(f"{edgar_server.url}/forbidden")
+    assert [path for path, _ in edgar_server.requests] == ["/forbidden"]
+    assert limiter.rate == 100
+    assert limiter.concurrency == 4
+
+
+def test_pickled_fetcher_keeps_its_rate_limiter():
+    limiter = RateLimiter(rate=100)
+    fetcher = Fetcher(user_agent="sec_edgar tests test@example.com", rate_limiter=limiter)
+    assert pickle.loads(pickle.dumps(fetcher)).rate_limiter is limiter
+
+
+def test_process_workers_get_custom_rate_limiters():
+    limiter = RateLimiter(rate=100)
+    fetcher = Fetcher(user_agent="sec_edgar tests test@example.com", rate_limiter=limiter)
+    with ProcessPoolExecutor(1, initializer=RateLimiter.set_shared, initargs=(RateLimiter.shared(), limiter)) as pool:
+        assert pool.submit(_limiter_rate, fetcher).result(timeout=30) == 100
+
+
+def _limiter_rate(fetcher):
+    return fetcher.rate_limiter.rate
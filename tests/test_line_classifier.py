@@ -0,0 +1,72 @@
+import os
+
+import dateutil.parser as dparser
+import pytest
+
+from sec_edgar.line_classifier import DATE_ROW
+from sec_edgar.line_classifier import HEADER
+from sec_edgar.line_classifier import LABEL_AND_NUMBERS
+from sec_edgar.line_classifier import PAGE_BREAK
+from sec_edgar.line_classifier import TEXT
+from sec_edgar.line_classifier import classify_line
+from sec_edgar.line_classifier import clean_table_line
+from sec_edgar.line_classifier import is_fuzzy_date
+from sec_edgar.line_classifier import skip_kind
+from sec_edgar.raw_text import RawLines
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def reference_is_date(line):
+    # the check Parser._lines_to_splitted_rows used to run
+    try:
+        dparser.parse(line, fuzzy=True)
+        return True
+    except:
+        return False
+
+
+def fixture_lines():
+    # every normalized line of the raw text fixture, cleaned the way table rows are
+    with open(os.path.join(FIXTURES, "statements.txt"), "r", encoding="utf8") as f:
+        return [clean_table_line(line) for line in RawLines(f.read()).lines]
+
+
+@pytest.mark.parametrize("line", ["Balance at December 31 1998", "Three months ended June 30", "Sept 2020",
+                                  "As of 12/31/99", "Wednesday"])
+def test_fuzzy_dates(line):
+    assert is_fuzzy_date(line)
+
+
+@pytest.mark.parametrize("line", ["Total current assets", "Marketing and administrative", "Mayer Corporation",
+                                  "Net sales"])
+def test_not_fuzzy_dates(line):
+    assert not is_fuzzy_date(line)
+
+
+@pytest.mark.parametrize("line, kind", [("<PAGE>", PAGE_BREAK), ("- 4 -", PAGE_BREAK), ("ASSETS", HEADER),
+                                        ("Net sales 1234 5678", LABEL_AND_NUMBERS),
+                                        ("Balance at December 1998:", DATE_ROW), ("Current assets:", TEXT)])
+def test_classify_line(line, kind):
+    assert classify_line(line) == kind
+
+
+def test_fuzzy_dates_agree_with_dateutil():
+    lines = fixture_lines()
+    dates = [line for line in lines if reference_is_date(line)]
+    assert dates and len(dates) < len(lines)
+    for line in lines:
+        assert is_fuzzy_date(line) == reference_is_date(line), line
+
+
+def test_classify_fixture_lines():
+    kinds = {}
+    for line in fixture_lines():
+        kind = classify_line(line)
+        # the date check only decides between the lines the skip and number checks keep
+        if skip_kind(line) is None and "." not in line and kind != LABEL_AND_NUMBERS:
+            assert kind == (DATE_ROW if reference_is_date(line) else TEXT), line
+        kinds.setdefault(kind, []).append(line)
+    assert {PAGE_BREAK, HEADER, LABEL_AND_NUMBERS, DATE_ROW, TEXT} <= set(kinds)
+    assert "Wednesday" in kinds[DATE_ROW]
+    assert "Current assets:" in kinds[TEXT]
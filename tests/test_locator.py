@@ -0,0 +1,45 @@
+import os
+
+from bs4 import BeautifulSoup
+
+from sec_edgar import Parser
+from sec_edgar.locator import TITLE_SPECS
+from sec_edgar.locator import locate_titles
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), "r", encoding="utf8") as f:
+        return f.read()
+
+
+def reference_titles(soup):
+    # one soup.find per spec through Parser._find_multiple_words, what the statement parsers used to run
+    parser = Parser()
+    return {name: soup.find(lambda tag: parser._find_multiple_words(tag, **spec.arguments)) for name, spec in
+            TITLE_SPECS.items()}
+
+
+def test_locator_agrees_with_the_reference():
+    soup = BeautifulSoup(read_fixture("statements.htm"), "lxml")
+    expected = reference_titles(soup)
+    located = locate_titles(soup)
+    for name in TITLE_SPECS:
+        assert located[name] is expected[name], name
+    # the table of contents, the long paragraph and the two children divs are skipped by both
+    assert located["income_statement"].text == "CONDENSED CONSOLIDATED STATEMENTS OF OPERATIONS (Unaudited)"
+    assert located["balance_sheet"].text == "CONDENSED CONSOLIDATED BALANCE SHEETS (Unaudited)"
+    assert located["balance_sheet_not_continued"] is located["balance_sheet"]
+    assert located["changes_in_equity"].text == "Statement of Changes in Stockholders' Equity"
+    assert located["consolidated_cash_flows"].name == "p"
+
+
+def test_first_is_the_earliest_title():
+    soup = BeautifulSoup(read_fixture("statements.htm"), "lxml")
+    located = locate_titles(soup)
+    expected = soup.find(lambda tag: Parser()._find_multiple_words(
+        tag, **TITLE_SPECS["consolidated_cash_flows"].arguments) or Parser()._find_multiple_words(
+        tag, **TITLE_SPECS["earnings_or_operations_statement"].arguments))
+    assert located.first("consolidated_cash_flows", "earnings_or_operations_statement") is expected
+    assert located.first("consolidated_cash_flows", "equity") is located["equity"]
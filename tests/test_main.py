@@ -0,0 +1,78 @@
+from datetime import date
+from datetime import timedelta
+
+import pytest
+
+from sec_edgar import ReportParser
+from sec_edgar import SecEdgar
+from sec_edgar.main import DAILY_HIGH_WATER_MARK
+
+from conftest import run_with_timeout
+
+
+def test_missing_daily_indexes_release_their_connections(edgar_server, fetcher, tmp_path):
+    edgar = SecEdgar(["AAPL"], str(tmp_path), fetcher)
+    days = [date(2020, 1, 4) + timedelta(days=i) for i in range(fetcher.connections + 3)]
+    results = []
+
+    def get_daily_indexes():
+        results.extend(edgar.get_daily_index(day) for day in days)
+
+    # with the 404s kept checked out the pool (pool_block=True) runs dry and the next request never returns
+    assert run_with_timeout(get_daily_indexes)
+    assert results == [None] * len(days)
+
+
+def daily_index_path(day):
+    return f"/Archives/edgar/daily-index/{day.year}/QTR{(day.month - 1) // 3 + 1}/master.{day:%Y%m%d}.idx"
+
+
+def daily_index(day, accession="0000320193-20-000001"):
+    return (200, b"CIK|Company Name|Form Type|Date Filed|Filename\n" +
+            f"320193|Apple Inc.|8-K|{day:%Y%m%d}|edgar/data/320193/{accession}.txt\n".encode(), {})
+
+
+def test_daily_index_failures_raise(edgar_server, fetcher, tmp_path):
+    edgar = SecEdgar(["AAPL"], str(tmp_path), fetcher)
+    day = date(2020, 1, 6)
+    edgar_server.routes[daily_index_path(day)] = (503, b"Slow Down", {})
+    with pytest.raises(ConnectionError):
+        edgar.get_daily_index(day)
+
+
+def test_update_stops_at_the_first_failed_day(edgar_server, fetcher, tmp_path):
+    today = date.today()
+    days = [today - timedelta(days=i) for i in (3, 2, 1)]
+    edgar_server.routes[daily_index_path(days[0])] = daily_index(days[0])
+    edgar_server.routes[daily_index_path(days[1])] = (500, b"Internal Server Error", {})
+    edgar_server.routes[daily_index_path(days[2])] = daily_index(days[2], "0000320193-20-000002")
+    edgar = SecEdgar(["AAPL"], str(tmp_path), fetcher)
+    edgar.update(ReportParser(str(tmp_path), fetcher), since=days[0])
+    # the failed day and everything after it are read again by the next update
+    assert edgar.filing_index.get_meta(DAILY_HIGH_WATER_MARK) == days[0].isoformat()
+    assert daily_index_path(days[2]) not in [path for path, _ in edgar_server.requests]
+
+
+def test_update_skips_unresolved_symbols(edgar_server, fetcher, tmp_path):
+    today = date.today()
+    edgar_server.routes[daily_index_path(today)] = daily_index(today)
+    edgar = SecEdgar(["AAPL", "NOT-A-TICKER"], str(tmp_path), fetcher)
+    assert "NOT-A-TICKER" not in edgar._ciks_map
+    edgar.update(ReportParser(str(tmp_path), fetcher), since=today)
+    assert edgar.filing_index.get_meta(DAILY_HIGH_WATER_MARK) == today.isoformat()
+
+
+def test_quarter_index_reloads_when_the_filing_index_was_rebuilt(edgar_server, fetcher, tmp_path):
+    edgar_server.routes["/Archives/edgar/full-index/2020/QTR1/master.idx"] = (
+        200, b"CIK|Company Name|Form Type|Date Filed|Filename\n"
+             b"320193|Apple Inc.|10-Q|2020-01-29|edgar/data/320193/0000320193-20-000010.txt\n",
+        {"ETag": '"quarter"'})
+    edgar = SecEdgar(["AAPL"], str(tmp_path), fetcher)
+    edgar.get_quarter_index(2020, 1)
+    # the http cache keeps the quarter's ETag while the filing index starts over
+    with edgar.filing_index._connection as connection:
+        connection.execute("DELETE FROM filings")
+        connection.execute("DELETE FROM quarters")
+    quarter_index = edgar.get_quarter_index(2020, 1)
+    assert quarter_index.get("320193_10-Q") == [
+        "https://www.sec.gov/Archives/edgar/data/320193/0000320193-20-000010.txt"]
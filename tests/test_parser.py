@@ -0,0 +1,18 @@
+import pandas as pd
+import pytest
+
+from sec_edgar import Parser
+
+
+@pytest.mark.parametrize("dash", ["-", "--", "‒", "–", "—", "―", "\x97", " — "])
+def test_dash_cells_are_zero(dash):
+    values = Parser()._fix_values(pd.Series(["1,234", dash, "(56)"]))
+    assert str(values.dtype) == "Int64"
+    assert values.tolist() == [1234, 0, -56]
+
+
+def test_fix_values():
+    values = Parser()._fix_values(pd.Series(["$ 1,234.5", "(1,234)", "(1)", "12(a)", "7*", "", None]))
+    assert values.dtype == "float64"
+    assert values.tolist()[:5] == [1234.5, -1234, -1, 12, 7]
+    assert values[5:].isna().all()
@@ -0,0 +1,68 @@
+import pytest
+
+from sec_edgar import ReportParser
+
+from conftest import run_with_timeout
+
+
+def missing_filings(fetcher):
+    return [f"https://www.sec.gov/Archives/edgar/data/320193/0000320193-20-{i:06d}.txt" for i in
+            range(fetcher.connections + 3)]
+
+
+def test_missing_filings_release_their_connections(edgar_server, fetcher, tmp_path):
+    report_parser = ReportParser(str(tmp_path), fetcher, cache_results=False)
+    errors = []
+
+    def parse_missing_filings():
+        for file_url in missing_filings(fetcher):
+            with pytest.raises(ConnectionError):
+                report_parser.parse(file_url)
+            errors.append(file_url)
+
+    # with the 404s kept checked out the pool (pool_block=True) runs dry and the next request never returns
+    assert run_with_timeout(parse_missing_filings)
+    assert len(errors) == fetcher.connections + 3
+
+
+FILING_URL = "https://www.sec.gov/Archives/edgar/data/320193/0000320193-20-000001.txt"
+INDEX_PATH = "/Archives/edgar/data/320193/000032019320000001/0000320193-20-000001-index.htm"
+PRIMARY_PATH = "/Archives/edgar/data/320193/000032019320000001/aapl-20200627.htm"
+FILING_INDEX = f"""<html><body>
+<div class="formGrouping"><div class="infoHead">Period of Report</div>
+<div class="info">2020-06-27</div></div>
+<table class="tableFile">
+<tr><th>Seq</th><th>Description</th><th>Document</th><th>Type</th><th>Size</th></tr>
+<tr><td>1</td><td>10-Q</td><td><a href="{PRIMARY_PATH}">aapl-20200627.htm</a></td><td>10-Q</td><td>1</td></tr>
+</table>
+</body></html>
+"""
+PRIMARY_DOCUMENT = "<html><body>\n<p>CONSOLIDATED\nBALANCE SHEETS</p>\n</body></html>\n"
+SUBMISSION = ("<SEC-HEADER>\nCONFORMED PERIOD OF REPORT:\t20200627\n</SEC-HEADER>\n<DOCUMENT>\n<TYPE>10-Q\n<TEXT>\n"
+              "CONSOLIDATED\nBALANCE SHEETS\n</TEXT>\n</DOCUMENT>\n")
+
+
+@pytest.mark.parametrize("save", [False, True])
+def test_primary_document_keeps_its_lines(edgar_server, fetcher, tmp_path, save):
+    edgar_server.routes[INDEX_PATH] = (200, FILING_INDEX.encode("utf8"), {})
+    edgar_server.routes[PRIMARY_PATH] = (200, PRIMARY_DOCUMENT.encode("utf8"), {})
+    report_parser = ReportParser(str(tmp_path), fetcher, fetch_mode="primary", cache_results=False)
+    submission = report_parser._get_submission(FILING_URL, save)
+    assert submission.period_of_report == "20200627"
+    assert submission.primary_document.text == PRIMARY_DOCUMENT
+
+
+def test_filings_without_an_index_release_their_connections(edgar_server, fetcher, tmp_path):
+    file_urls = missing_filings(fetcher)
+    for file_url in file_urls:
+        edgar_server.routes[file_url[len("https://www.sec.gov"):]] = (200, SUBMISSION.encode("utf8"), {})
+    report_parser = ReportParser(str(tmp_path), fetcher, fetch_mode="primary", cache_results=False)
+    submissions = []
+
+    def get_submissions():
+        submissions.extend(report_parser._get_submission(file_url, save=False) for file_url in file_urls)
+
+    # every filing index is a 404, the full submission is read instead
+    assert run_with_timeout(get_submissions)
+    assert [submission.primary_document.text for submission in submissions] == [
+        "CONSOLIDATED\nBALANCE SHEETS"] * len(file_urls)
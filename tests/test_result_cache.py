@@ -0,0 +1,21 @@
+from sec_edgar import BalanceSheetParser
+from sec_edgar import GeneralParser
+from sec_edgar import IncomeStatementParser
+from sec_edgar.result_cache import parser_fingerprint
+from sec_edgar.result_cache import parser_modules
+
+
+def test_parser_modules_follow_imports():
+    names = [module.__name__ for module in parser_modules(IncomeStatementParser)]
+    for name in ("sec_edgar.income_statement_parser", "sec_edgar.parser", "sec_edgar.document", "sec_edgar.locator",
+                 "sec_edgar.raw_text", "sec_edgar.line_classifier", "sec_edgar.table_grid", "sec_edgar.xbrl",
+                 "sec_edgar.sgml"):
+        assert name in names
+    # nothing the parsers don't depend on
+    assert "sec_edgar.fetcher" not in names
+    assert "sec_edgar.report_parser" not in names
+
+
+def test_parser_fingerprint_is_per_parser():
+    assert parser_fingerprint(BalanceSheetParser()) == parser_fingerprint(BalanceSheetParser())
+    assert parser_fingerprint(BalanceSheetParser()) != parser_fingerprint(GeneralParser())
@@ -0,0 +1,32 @@
+from concurrent.futures import wait
+
+import pytest
+
+from sec_edgar.run_ledger import RunLedger
+from sec_edgar.scheduler import ReportScheduler
+
+
+class BrokenFetcher(object):
+    # takes one filing off the queue and dies
+    def iter_fetch(self, items, fetch, workers=None, max_queued=16):
+        next(items)
+        raise RuntimeError("pipeline died")
+        yield
+
+
+class Parser(object):
+    parsers = []
+
+
+def test_pipeline_failure_fails_every_queued_filing(tmp_path):
+    ledger = RunLedger(str(tmp_path / "ledger.db"))
+    scheduler = ReportScheduler(Parser(), BrokenFetcher(), ledger, ledger.start_run({}), executor="hybrid",
+                                processes=1)
+    with scheduler:
+        futures = [scheduler.submit(f"https://www.sec.gov/Archives/edgar/data/320193/0000320193-20-00000{i}.txt")
+                   for i in range(4)]
+        _, not_done = wait(futures, timeout=10)
+        assert not not_done
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result()
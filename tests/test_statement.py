@@ -0,0 +1,58 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from sec_edgar import IncomeStatementParser
+from sec_edgar import Statement
+from sec_edgar import StatementPanel
+
+
+def frame():
+    return pd.DataFrame([["Net sales", 59685, 198470, 58313], ["Other", None, -1234, 12]],
+                        columns=["name", "period: 3, june 27, 2020", "period: 9, june 27, 2020",
+                                 "period: 3, june 29, 2019"])
+
+
+def test_from_frame():
+    statement = Statement.from_frame(frame())
+    assert statement.labels == ("Net sales", "Other")
+    assert statement.columns.tolist() == [(3, np.datetime64("2020-06-27")), (9, np.datetime64("2020-06-27")),
+                                          (3, np.datetime64("2019-06-29"))]
+    assert np.isnan(statement.values[1, 0])
+    assert statement.values[:, 1:].tolist() == [[198470, 58313], [-1234, 12]]
+    assert statement.to_frame().columns.tolist() == frame().columns.tolist()
+
+
+def test_from_frame_with_duplicate_columns():
+    df = frame()
+    df.columns = ["name", "period: 3, june 27, 2020", "period: 3, june 27, 2020", "period: 3, june 29, 2019"]
+    statement = Statement.from_frame(df)
+    assert statement.values.shape == (2, 3)
+    assert statement.values[0].tolist() == [59685, 198470, 58313]
+
+
+def test_from_frame_with_nullable_integers():
+    df = frame()
+    df["period: 3, june 27, 2020"] = df["period: 3, june 27, 2020"].astype("Int64")
+    assert np.isnan(Statement.from_frame(df).values[1, 0])
+
+
+def test_pickled_labels_are_interned():
+    statement = pickle.loads(pickle.dumps(Statement.from_frame(frame())))
+    assert statement.labels[0] is Statement.from_frame(frame()).labels[0]
+    assert statement.values.tolist()[0] == [59685, 198470, 58313]
+
+
+def test_statement_panel():
+    statement = Statement.from_frame(frame())
+    df = StatementPanel([statement, statement], keys=["q2", "q3"]).to_frame()
+    assert len(df) == 12
+    assert df["key"].tolist() == ["q2"] * 6 + ["q3"] * 6
+    assert df["period_months"].tolist()[:3] == [3, 9, 3]
+
+
+def test_normalized_columns_keep_their_period():
+    df = pd.DataFrame([["Net sales", 1, 2]], columns=["name", "period: 3, June 27 2020", "period: 9, June 27 2020"])
+    df = IncomeStatementParser()._normalize_column_name(df)
+    assert df.columns.tolist() == ["name", "period: 3, june 27, 2020", "period: 9, june 27, 2020"]
@@ -0,0 +1,43 @@
+from bs4 import BeautifulSoup
+
+from sec_edgar.table_grid import table_to_grid
+
+TABLE = """
+<table>
+  <thead><tr><th></th><th colspan="2">Three Months Ended</th></tr></thead>
+  <tr><td>Net sales</td><td>$</td><td>1,234</td></tr>
+  <tr><td rowspan="2">Cost of sales</td><td>(56</td><td>)</td></tr>
+  <tr><td>7</td><td>8</td></tr>
+  <tr style="display:none"><td>Hidden</td><td>1</td><td>2</td></tr>
+  <tr style="visibility: hidden"><td>Invisible</td><td>1</td><td>2</td></tr>
+  <tr><td>Total<span style="display:none">hidden</span></td><td><table><tr><td>nested</td></tr></table></td></tr>
+</table>
+"""
+
+
+def grid(**kwargs):
+    return table_to_grid(BeautifulSoup(TABLE, "lxml").find("table"), **kwargs)
+
+
+def test_table_to_grid_repeats_spans():
+    rows, header_rows = grid()
+    assert header_rows == 1
+    assert rows == [
+        ["", "Three Months Ended", "Three Months Ended"],
+        ["Net sales", "$", "1,234"],
+        ["Cost of sales", "(56", ")"],
+        ["Cost of sales", "7", "8"],
+        ["Invisible", "1", "2"],
+        ["Total", "nested", ""],
+    ]
+
+
+def test_table_to_grid_for_the_native_path():
+    rows, _ = grid(repeat_spans=False, skip_invisible_rows=True)
+    assert rows == [
+        ["", "Three Months Ended", ""],
+        ["Net sales", "$", "1,234"],
+        ["Cost of sales", "(56", ")"],
+        ["", "7", "8"],
+        ["Total", "nested", ""],
+    ]
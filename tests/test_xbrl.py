@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from sec_edgar import BalanceSheetParser
+from sec_edgar import IncomeStatementParser
+from sec_edgar.xbrl import Presentation
+from sec_edgar.xbrl import is_inline_xbrl
+from sec_edgar.xbrl import read_inline_xbrl
+from sec_edgar.xbrl import read_labels
+from sec_edgar.xbrl import read_presentation
+from sec_edgar.xbrl import read_xbrl
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+BALANCE_SHEET_ROLE = "http://www.apple.com/role/CONSOLIDATEDBALANCESHEETS"
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), "r", encoding="utf8") as f:
+        return f.read()
+
+
+@pytest.fixture
+def presentation():
+    return Presentation(read_presentation(read_fixture("presentation.xml")), read_labels(read_fixture("labels.xml")))
+
+
+def test_read_xbrl():
+    facts = read_xbrl(read_fixture("instance.xml"))
+    # the nil fact is skipped, the text fact is kept apart
+    assert len(facts) == 6
+    assert facts.value("us-gaap:Assets") == 317344000000
+    assert facts.value("us-gaap:Revenues") == 59685000000
+    assert facts.value("us-gaap:OtherAssetsCurrent") is None
+    assert facts.texts == {"dei:EntityRegistrantName": "Apple Inc."}
+
+
+def test_read_xbrl_inside_a_submission():
+    facts = read_xbrl(f"<XBRL>\n{read_fixture('instance.xml')}\n</XBRL>\n")
+    assert len(facts) == 6
+
+
+def test_read_inline_xbrl():
+    text = read_fixture("inline.htm")
+    assert is_inline_xbrl(text)
+    assert not is_inline_xbrl(read_fixture("instance.xml"))
+    facts = read_inline_xbrl(text)
+    assert len(facts) == 4
+    assert facts.value("us-gaap:Revenues") == 59685000000
+    assert facts.value("us-gaap:OtherNonoperatingIncomeExpense") == -1234000000
+    assert facts.value("us-gaap:Goodwill") == 0
+    assert facts.value("us-gaap:Assets") == 1234500
+    assert facts.value("us-gaap:Liabilities") is None
+    assert facts.texts == {"dei:EntityRegistrantName": "Apple Inc."}
+
+
+def test_read_presentation():
+    roles = read_presentation(read_fixture("presentation.xml"))
+    # depth first, siblings by their arcs' order
+    assert roles[BALANCE_SHEET_ROLE] == [
+        ("us-gaap:StatementOfFinancialPositionAbstract", None),
+        ("us-gaap:CashAndCashEquivalentsAtCarryingValue", None),
+        ("us-gaap:Assets", "http://www.xbrl.org/2003/role/totalLabel"),
+    ]
+
+
+def test_statement_concepts(presentation):
+    # the parenthetical role comes first in the linkbase and is skipped
+    assert presentation.statement_concepts(BalanceSheetParser.xbrl_role) == [
+        ("us-gaap:StatementOfFinancialPositionAbstract", "StatementOfFinancialPositionAbstract"),
+        ("us-gaap:CashAndCashEquivalentsAtCarryingValue", "Cash and cash equivalents"),
+        ("us-gaap:Assets", "Total assets"),
+    ]
+    assert presentation.statement_concepts(IncomeStatementParser.xbrl_role) == [
+        ("us-gaap:IncomeStatementAbstract", "IncomeStatementAbstract"),
+        ("us-gaap:Revenues", "Revenues"),
+    ]
+
+
+def test_statement(presentation):
+    facts = read_xbrl(read_fixture("instance.xml"))
+    df = facts.statement(presentation.statement_concepts(BalanceSheetParser.xbrl_role))
+    assert df.columns.tolist() == ["name", "period: 3, june 27, 2020", "period: 3, september 28, 2019"]
+    # the abstract has no facts and the dimensional assets fact isn't part of the statement
+    assert df["name"].tolist() == ["Cash and cash equivalents", "Total assets"]
+    assert df.iloc[:, 1:].values.tolist() == [[33383000000, 48844000000], [317344000000, 338516000000]]
+
+
+def test_parse_xbrl_needs_a_presentation(presentation):
+    facts = read_xbrl(read_fixture("instance.xml"))
+    assert BalanceSheetParser()._parse_xbrl(facts) is None
+    facts.presentation = presentation
+    assert BalanceSheetParser()._parse_xbrl(facts)["name"].tolist() == ["Cash and cash equivalents", "Total assets"]